@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.core.database import get_db
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.api.v1.endpoints.auth import get_current_active_user
+from app.models.user import User
+from app.schemas.api_key import ApiKey, ApiKeyCreate, ApiKeyCreated
+from app.services.api_key_service import ApiKeyService
+
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+
+@router.get("/", response_model=List[ApiKey])
+async def get_api_keys(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the current user's API keys"""
+    api_key_service = ApiKeyService(db)
+    return api_key_service.get_user_api_keys(current_user.id)
+
+
+@router.post("/", response_model=ApiKeyCreated)
+async def create_api_key(
+    key_data: ApiKeyCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create an API key (the key is only shown in this response)"""
+    if "catalog:write" in key_data.scopes and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    api_key_service = ApiKeyService(db)
+    api_key, raw_key = api_key_service.create_api_key(current_user.id, key_data)
+    return ApiKeyCreated(**ApiKey.model_validate(api_key).model_dump(), key=raw_key)
+
+
+@router.delete("/{key_id}")
+async def revoke_api_key(
+    key_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Revoke one of the current user's API keys"""
+    api_key_service = ApiKeyService(db)
+    success = api_key_service.revoke_api_key(current_user.id, key_id)
+    
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
+    
+    return {"message": "API key revoked successfully"}
@@ -1,60 +1,203 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 from app.core.database import get_db
-from app.core.security import create_access_token, create_refresh_token, decode_token, verify_password
+from app.core.security import create_access_token, create_refresh_token, decode_token
 from app.core.config import settings
+from app.core.rate_limit import RateLimiter, auth_rate_limit, catalog_rate_limit, client_ip, login_user_rate_limit
+from app.core.unit_of_work import UnitOfWorkRoute
 from app.models.user import User
-from app.schemas.user import Token, UserCreate, User as UserSchema, LoginRequest, RefreshTokenRequest
-from app.services.user_service import UserService
+from app.schemas.api_key import ApiKeyPrincipal
+from app.schemas.user import Token, TokenData, UserCreate, User as UserSchema, LoginRequest, RefreshTokenRequest
+from app.services.user_service import UserService, UserConflictError
+from app.services.token_service import token_revocation_store
+from app.services.api_key_service import ApiKeyService
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
+api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
+api_key_rate_limit = RateLimiter("api_key", settings.API_KEY_RATE_LIMIT)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get current authenticated user"""
+def create_user_access_token(user: User) -> str:
+    """Create an access token carrying the user's authorization claims"""
+    return create_access_token(data={
+        "sub": str(user.id),
+        "is_active": user.is_active,
+        "is_superuser": user.is_superuser,
+        "ver": user.token_version or 0,
+    })
+
+
+def _decode_access_payload(token: Optional[str], db: Session) -> dict:
+    """Decode a bearer token and reject revoked ones and refresh tokens"""
     payload = decode_token(token)
-    user_id = payload.get("sub")
-    if user_id is None:
+    if payload.get("sub") is None or payload.get("type") != "access":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if token_revocation_store.is_revoked(db, payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+def _check_token_version(payload: dict, current_version: Optional[int]) -> None:
+    """Reject tokens minted before the user's token_version was bumped"""
+    if current_version is None or payload.get("ver", current_version) != current_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token is no longer valid",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def user_conflict_exception(fields: List[str]) -> HTTPException:
+    """Build the error response for a taken email or username"""
+    detail = "Email already registered" if "email" in fields else "Username already taken"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """Get current authenticated user"""
+    payload = _decode_access_payload(token, db)
+    
     user_service = UserService(db)
-    user = user_service.get_user_by_id(int(user_id))
+    user = user_service.get_cached_user(int(payload["sub"]))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    _check_token_version(payload, user.token_version)
     return user
 
 
+async def get_api_key(
+    request: Request,
+    api_key: Optional[str] = Depends(api_key_scheme),
+    db: Session = Depends(get_db)
+) -> Optional[ApiKeyPrincipal]:
+    """Get the API key sent in X-API-Key (None if the header is absent)"""
+    if api_key is None:
+        return None
+    
+    key = ApiKeyService(db).authenticate(api_key)
+    if key is None:
+        # Failed key guesses count against the caller's IP
+        await catalog_rate_limit(request)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+        )
+    return key
+
+
+async def limit_catalog_access(request: Request, api_key: Optional[ApiKeyPrincipal] = Depends(get_api_key)):
+    """Rate limit catalog traffic per API key when one is sent, otherwise per client IP"""
+    if api_key is None:
+        await catalog_rate_limit(request)
+    else:
+        await api_key_rate_limit.check(str(api_key.id))
+
+
+def get_current_claims(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> TokenData:
+    """Get authorization claims from the access token without loading the user"""
+    payload = _decode_access_payload(token, db)
+    user_id = int(payload["sub"])
+    
+    if "ver" not in payload:
+        # Token minted before claims were added: fall back to the user record
+        user = get_current_user(token, db)
+        return TokenData(
+            user_id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            token_version=user.token_version,
+        )
+    
+    _check_token_version(payload, UserService(db).get_token_version(user_id))
+    return TokenData(
+        user_id=user_id,
+        is_active=payload.get("is_active", False),
+        is_superuser=payload.get("is_superuser", False),
+        token_version=payload["ver"],
+    )
+
+
+def get_current_active_claims(claims: TokenData = Depends(get_current_claims)) -> TokenData:
+    """Get claims of the current active user"""
+    if not claims.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return claims
+
+
+def get_catalog_claims(
+    token: Optional[str] = Depends(oauth2_scheme),
+    api_key: Optional[ApiKeyPrincipal] = Depends(get_api_key),
+    db: Session = Depends(get_db)
+) -> TokenData:
+    """Get claims from the access token or, on catalog routes only, from an API key"""
+    if token is None and api_key is not None:
+        # Scoped API keys only ever grant catalog access, and never more than their owner has now
+        return TokenData(
+            user_id=api_key.user_id,
+            is_active=api_key.owner_is_active,
+            is_superuser="catalog:write" in api_key.scopes and api_key.owner_is_superuser,
+            token_version=api_key.owner_token_version,
+        )
+    return get_current_claims(token, db)
+
+
+def get_current_active_catalog_claims(claims: TokenData = Depends(get_catalog_claims)) -> TokenData:
+    """Get claims of the current active user or API key owner on catalog routes"""
+    return get_current_active_claims(claims)
+
+
 def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[User]:
     """Get current authenticated user (optional - returns None if not authenticated)"""
     if token is None:
         return None
     
     try:
-        payload = decode_token(token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            return None
-        
-        user_service = UserService(db)
-        user = user_service.get_user_by_id(int(user_id))
-        return user
-    except:
+        return get_current_user(token, db)
+    except (HTTPException, ValueError):
         return None
 
 
+class LazyCurrentUser:
+    """Optional current user that is only resolved when a handler asks for it"""
+
+    def __init__(self, token: Optional[str], db: Session):
+        self._token = token
+        self._db = db
+        self._resolved = False
+        self._user = None
+
+    def get(self) -> Optional[User]:
+        """Resolve the user (None if not authenticated); no work if never called"""
+        if not self._resolved:
+            self._user = get_current_user_optional(self._token, self._db)
+            self._resolved = True
+        return self._user
+
+
+def get_lazy_current_user(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> LazyCurrentUser:
+    """Get a lazily resolved optional current user (no token decode or query until used)"""
+    return LazyCurrentUser(token, db)
+
+
 def get_current_active_user(current_user: User = Depends(get_current_user)):
     """Get current active user"""
     if not current_user.is_active:
@@ -62,46 +205,51 @@ def get_current_active_user(current_user: User = Depends(get_current_user)):
     return current_user
 
 
-@router.post("/register", response_model=UserSchema)
+@router.post("/register", response_model=UserSchema, dependencies=[Depends(auth_rate_limit)])
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     user_service = UserService(db)
     
-    # Check if user already exists
-    if user_service.get_user_by_email(user_data.email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    if user_service.get_user_by_username(user_data.username):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
+    # Check email and username in one query; the unique indexes stay authoritative
+    conflicts = user_service.find_conflicts(user_data.email, user_data.username)
+    if conflicts:
+        raise user_conflict_exception(conflicts)
     
-    user = user_service.create_user(user_data)
+    try:
+        user = await user_service.create_user(user_data)
+    except UserConflictError as e:
+        raise user_conflict_exception(e.fields)
     return user
 
 
-@router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(auth_rate_limit)])
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
     """Login for access token"""
+    # Throttle failed attempts per account and client, so guessing from one
+    # IP is slowed but nobody else can lock the account's owner out
+    attempt_key = f"{form_data.username.lower()}:{client_ip(request)}"
+    await login_user_rate_limit.check(attempt_key, cost=0)
+    
     user_service = UserService(db)
-    user = user_service.authenticate_user(form_data.username, form_data.password)
+    user = await user_service.authenticate_user(form_data.username, form_data.password)
     
     if not user:
+        await login_user_rate_limit.check(attempt_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_user_access_token(user)
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     # Update last login
-    user_service.update_last_login(user.id)
+    user_service.update_last_login(user)
     
     return {
         "access_token": access_token,
@@ -110,7 +258,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     }
 
 
-@router.post("/refresh", response_model=Token)
+@router.post("/refresh", response_model=Token, dependencies=[Depends(auth_rate_limit)])
 async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(get_db)):
     """Refresh access token"""
     payload = decode_token(token_data.refresh_token)
@@ -122,7 +270,8 @@ async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(g
         )
     
     user_id = payload.get("sub")
-    if user_id is None:
+    jti = payload.get("jti")
+    if user_id is None or jti is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
@@ -136,8 +285,15 @@ async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(g
             detail="User not found"
         )
     
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    access_token = create_user_access_token(user)
+    refresh_token = create_refresh_token(data={"sub": user_id})
+    
+    # Rotate: each refresh token can be exchanged exactly once
+    if not token_revocation_store.revoke(db, jti, datetime.utcfromtimestamp(payload["exp"])):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked"
+        )
     
     return {
         "access_token": access_token,
@@ -146,6 +302,34 @@ async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(g
     }
 
 
+@router.post("/logout", dependencies=[Depends(auth_rate_limit)])
+async def logout(
+    token_data: RefreshTokenRequest,
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Revoke the refresh token and, if sent, the current access token"""
+    payload = decode_token(token_data.refresh_token)
+    if payload.get("type") != "refresh" or payload.get("jti") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type"
+        )
+    token_revocation_store.revoke(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    
+    if token:
+        try:
+            access_payload = decode_token(token)
+        except HTTPException:
+            access_payload = {}
+        if access_payload.get("jti"):
+            token_revocation_store.revoke(
+                db, access_payload["jti"], datetime.utcfromtimestamp(access_payload["exp"])
+            )
+    
+    return {"message": "Logged out successfully"}
+
+
 @router.get("/me", response_model=UserSchema)
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     """Get current user profile"""
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.v1.endpoints.auth import get_current_active_claims
+from app.core.database import async_replica_router, replica_router
+from app.core.pool_metrics import pool_stats
+from app.core.rate_limit import rate_limit_stats
+from app.core.sql_instrumentation import sql_stats
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.schemas.user import TokenData
+
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+
+@router.get("/")
+async def get_diagnostics(current_user: TokenData = Depends(get_current_active_claims)):
+    """Get connection pool, replica, rate limiter and SQL stats for this worker (admin only)"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return {
+        "pools": pool_stats(),
+        "replicas": {"sync": replica_router.status(), "async": async_replica_router.status()},
+        "rate_limits": dict(rate_limit_stats),
+        "sql": sql_stats.snapshot(),
+    }
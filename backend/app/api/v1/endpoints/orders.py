@@ -1,13 +1,71 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
 
-router = APIRouter()
+from app.core.database import get_db
+from app.core.idempotency import idempotency_store
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.api.v1.endpoints.auth import get_current_active_user
+from app.models.user import User
+from app.schemas.order import Order, OrderCreate
+from app.services.order_service import OrderService, OrderError
 
-@router.get("/")
-async def get_orders():
-    """Get user orders"""
-    return {"message": "Orders endpoint - to be implemented"}
+router = APIRouter(route_class=UnitOfWorkRoute)
 
-@router.post("/")
-async def create_order():
-    """Create new order"""
-    return {"message": "Create order endpoint - to be implemented"}
+
+@router.get("/", response_model=List[Order])
+async def get_orders(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the current user's orders"""
+    order_service = OrderService(db)
+    return order_service.get_user_orders(current_user.id, skip=skip, limit=limit)
+
+
+@router.post("/", response_model=Order)
+async def create_order(
+    order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create new order.
+
+    Retries with the same Idempotency-Key get the first response back
+    (with Idempotent-Replayed: true) instead of a second order and payment.
+    """
+    async with idempotency_store.guard(db, f"orders:{current_user.id}", idempotency_key, order_data) as request:
+        if request.replay is not None:
+            return request.replay
+
+        order_service = OrderService(db)
+        try:
+            order = order_service.create_order(current_user, order_data)
+        except OrderError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        return request.respond(Order.model_validate(order))
+
+
+@router.get("/{order_id}", response_model=Order)
+async def get_order(
+    order_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get one of the current user's orders"""
+    order_service = OrderService(db)
+    order = order_service.get_user_order(current_user.id, order_id)
+
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+
+    return order
@@ -3,25 +3,27 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.core.database import get_db
-from app.api.v1.endpoints.auth import get_current_active_user, get_current_user, get_current_user_optional
-from app.models.user import User
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.api.v1.endpoints.auth import get_current_active_catalog_claims, get_lazy_current_user, LazyCurrentUser
+from app.schemas.user import TokenData
 from app.schemas.product import (
     Product, ProductCreate, ProductUpdate, ProductList,
-    ProductCategory, ProductCategoryCreate, ProductCategoryUpdate
+    ProductCategory, ProductCategoryCreate, ProductCategoryUpdate,
+    ProductBulkUpdate, ProductBulkDelete, ProductBulkResult
 )
-from app.services.product_service import ProductService
+from app.services.product_service import ProductService, SlugConflictError
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 # Product Categories
 @router.get("/categories", response_model=List[ProductCategory])
-async def get_categories(
+def get_categories(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    """Get all product categories"""
+    """Get all product categories (read-only: runs in the threadpool, off the event loop)"""
     product_service = ProductService(db)
     return product_service.get_categories(skip=skip, limit=limit)
 
@@ -30,7 +32,7 @@ async def get_categories(
 async def create_category(
     category_data: ProductCategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_catalog_claims)
 ):
     """Create a new product category (admin only)"""
     if not current_user.is_superuser:
@@ -45,7 +47,7 @@ async def create_category(
 
 # Products
 @router.get("/", response_model=List[ProductList])
-async def get_products(
+def get_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     category_id: Optional[int] = Query(None),
@@ -54,7 +56,7 @@ async def get_products(
     search: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
-    """Get products with optional filtering"""
+    """Get products with optional filtering (read-only: runs in the threadpool)"""
     product_service = ProductService(db)
     return product_service.get_products(
         skip=skip,
@@ -67,20 +69,80 @@ async def get_products(
 
 
 @router.get("/featured", response_model=List[ProductList])
-async def get_featured_products(
+def get_featured_products(
     limit: int = Query(10, ge=1, le=20),
     db: Session = Depends(get_db)
 ):
-    """Get featured products"""
+    """Get featured products (read-only: runs in the threadpool)"""
     product_service = ProductService(db)
     return product_service.get_featured_products(limit=limit)
 
 
+@router.post("/bulk-create", response_model=ProductBulkResult)
+async def bulk_create_products(
+    products_data: List[ProductCreate],
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_current_active_catalog_claims)
+):
+    """Import many products at once (admin only)"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    product_service = ProductService(db)
+    affected = product_service.create_products(products_data)
+    return {"affected": affected}
+
+
+@router.post("/bulk-update", response_model=ProductBulkResult)
+async def bulk_update_products(
+    bulk_data: ProductBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_current_active_catalog_claims)
+):
+    """Update all products matching a filter (admin only)"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    product_service = ProductService(db)
+    try:
+        affected = product_service.bulk_update_products(bulk_data.filter, bulk_data.patch)
+    except SlugConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    return {"affected": affected}
+
+
+@router.post("/bulk-delete", response_model=ProductBulkResult)
+async def bulk_delete_products(
+    bulk_data: ProductBulkDelete,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_current_active_catalog_claims)
+):
+    """Soft delete all products matching a filter (admin only)"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    product_service = ProductService(db)
+    affected = product_service.bulk_delete_products(bulk_data.filter)
+    return {"affected": affected}
+
+
 @router.get("/{product_id}", response_model=Product)
 async def get_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: LazyCurrentUser = Depends(get_lazy_current_user)
 ):
     """Get product by ID"""
     product_service = ProductService(db)
@@ -102,7 +164,7 @@ async def get_product(
 async def get_product_by_slug(
     slug: str,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: LazyCurrentUser = Depends(get_lazy_current_user)
 ):
     """Get product by slug"""
     product_service = ProductService(db)
@@ -124,7 +186,7 @@ async def get_product_by_slug(
 async def create_product(
     product_data: ProductCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_catalog_claims)
 ):
     """Create a new product (admin only)"""
     if not current_user.is_superuser:
@@ -142,7 +204,7 @@ async def update_product(
     product_id: int,
     product_data: ProductUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_catalog_claims)
 ):
     """Update a product (admin only)"""
     if not current_user.is_superuser:
@@ -167,7 +229,7 @@ async def update_product(
 async def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_catalog_claims)
 ):
     """Delete a product (admin only)"""
     if not current_user.is_superuser:
@@ -3,12 +3,13 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
-from app.api.v1.endpoints.auth import get_current_active_user
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.api.v1.endpoints.auth import get_current_active_user, user_conflict_exception
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate, UserPasswordUpdate
-from app.services.user_service import UserService
+from app.services.user_service import UserService, UserConflictError
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.get("/me", response_model=UserSchema)
@@ -26,25 +27,18 @@ async def update_current_user_profile(
     """Update current user profile"""
     user_service = UserService(db)
     
-    # Check if email is being changed and if it's already taken
-    if user_data.email and user_data.email != current_user.email:
-        existing_user = user_service.get_user_by_email(user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+    # Check changed email/username in one query; the unique indexes stay authoritative
+    email = user_data.email if user_data.email != current_user.email else None
+    username = user_data.username if user_data.username != current_user.username else None
+    conflicts = user_service.find_conflicts(email, username, exclude_user_id=current_user.id)
+    if conflicts:
+        raise user_conflict_exception(conflicts)
     
-    # Check if username is being changed and if it's already taken
-    if user_data.username and user_data.username != current_user.username:
-        existing_user = user_service.get_user_by_username(user_data.username)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
+    try:
+        updated_user = user_service.update_user(current_user.id, user_data)
+    except UserConflictError as e:
+        raise user_conflict_exception(e.fields)
     
-    updated_user = user_service.update_user(current_user.id, user_data)
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -61,17 +55,17 @@ async def update_current_user_password(
     db: Session = Depends(get_db)
 ):
     """Update current user password"""
-    from app.core.security import verify_password
+    from app.core.security import verify_password_async
     
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
     user_service = UserService(db)
-    success = user_service.update_password(current_user.id, password_data.new_password)
+    success = await user_service.update_password(current_user.id, password_data.new_password)
     
     if not success:
         raise HTTPException(
@@ -1,9 +1,13 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, products, orders
+from fastapi import APIRouter, Depends
+from app.api.v1.endpoints import auth, users, products, orders, api_keys, diagnostics
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(products.router, prefix="/products", tags=["products"])
+api_router.include_router(
+    products.router, prefix="/products", tags=["products"], dependencies=[Depends(auth.limit_catalog_access)]
+)
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
+api_router.include_router(api_keys.router, prefix="/api-keys", tags=["api keys"])
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
@@ -1,41 +1,168 @@
-from sqlalchemy import create_engine
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 
 from app.core.config import settings
+from app.core.pool_metrics import PoolMetrics, instrument_engine, timed_pool_class
+from app.core.read_replicas import ReplicaRouter, RoutingSession
+from app.core.sql_instrumentation import instrument_sql
+from app.core.unit_of_work import join_request
+
+
+def pool_options(url: str, metrics: PoolMetrics, base_pool=QueuePool) -> dict:
+    """Engine keyword arguments for the configured, instrumented connection pool"""
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps SQLAlchemy's single-connection pool
+        return {}
+    # File SQLite is pooled too, so connections (and their PRAGMA setup) are
+    # reused; each pooled aiosqlite connection owns a non-daemon thread,
+    # which dispose_engines() closes at shutdown
+    return {
+        "poolclass": timed_pool_class(base_pool, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def sqlite_pragmas() -> dict:
+    """SQLite PRAGMAs of the configured tuning profile"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Connect event: apply the SQLite tuning profile to a new connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_database_engine(url: str, name: str) -> Engine:
+    """Create a sync engine with the configured pool, metrics and SQLite tuning"""
+    metrics = PoolMetrics()
+    db_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {},
+        echo=settings.ENVIRONMENT == "development",
+        **pool_options(url, metrics)
+    )
+    instrument_engine(name, db_engine, metrics)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        instrument_sql(db_engine)
+    if db_engine.dialect.name == "sqlite" and settings.SQLITE_PRAGMAS_ENABLED:
+        event.listen(db_engine, "connect", set_sqlite_pragmas)
+    return db_engine
+
+
+def create_replica_router(replicas: list, probe_engines: Optional[list] = None) -> ReplicaRouter:
+    """Round-robin router over replica sync engines; disconnects take a replica out of rotation"""
+    router = ReplicaRouter(replicas, settings.REPLICA_HEALTH_CHECK_SECONDS, probe_engines)
+    for replica in replicas:
+        event.listen(
+            replica, "handle_error",
+            lambda context: router.mark_down(context.engine) if context.is_disconnect else None
+        )
+    return router
+
 
 # Sync database setup
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.ENVIRONMENT == "development"
-)
+engine = create_database_engine(settings.DATABASE_URL, "primary")
+replica_engines = [
+    create_database_engine(url, f"replica-{index}") for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+replica_router = create_replica_router(replica_engines)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, router=replica_router
+)
 
 # Create Base class for models
 Base = declarative_base()
 
 
 def get_db():
-    """Dependency to get database session"""
+    """Dependency to get database session (committed once by UnitOfWorkRoute routes)"""
     db = SessionLocal()
+    join_request(db)
     try:
         yield db
     finally:
         db.close()
 
 
-# Async database setup (for future use)
-if "postgresql" in settings.DATABASE_URL:
-    async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
-    async_engine = create_async_engine(async_database_url, echo=settings.ENVIRONMENT == "development")
-    AsyncSessionLocal = async_sessionmaker(
-        async_engine, class_=AsyncSession, expire_on_commit=False
+# Async database setup
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver (aiosqlite / asyncpg)"""
+    database_url = make_url(url)
+    backend = database_url.get_backend_name()
+    if backend == "sqlite":
+        database_url = database_url.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        database_url = database_url.set(drivername="postgresql+asyncpg")
+    return database_url.render_as_string(hide_password=False)
+
+
+def create_async_database_engine(url: str, name: str) -> AsyncEngine:
+    """Create an async engine with the configured pool, metrics and SQLite tuning"""
+    metrics = PoolMetrics()
+    db_engine = create_async_engine(
+        get_async_database_url(url),
+        echo=settings.ENVIRONMENT == "development",
+        **pool_options(url, metrics, AsyncAdaptedQueuePool)
     )
-    
-    async def get_async_db():
-        """Dependency to get async database session"""
-        async with AsyncSessionLocal() as session:
-            yield session
+    instrument_engine(name, db_engine.sync_engine, metrics)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        instrument_sql(db_engine.sync_engine)
+    if db_engine.dialect.name == "sqlite" and settings.SQLITE_PRAGMAS_ENABLED:
+        event.listen(db_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return db_engine
+
+
+async_engine = create_async_database_engine(settings.DATABASE_URL, "async")
+async_replica_engines = [
+    create_async_database_engine(url, f"async-replica-{index}")
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+# Health checks use the sync engines for the same URLs: an async engine cannot connect from the checker thread
+async_replica_router = create_replica_router(
+    [replica.sync_engine for replica in async_replica_engines], probe_engines=replica_engines
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    router=async_replica_router
+)
+
+
+async def get_async_db():
+    """Dependency to get async database session (committed once by UnitOfWorkRoute routes)"""
+    async with AsyncSessionLocal() as session:
+        join_request(session)
+        yield session
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections of every engine (application shutdown)"""
+    for async_db_engine in [async_engine, *async_replica_engines]:
+        await async_db_engine.dispose()
+    for db_engine in [engine, *replica_engines]:
+        db_engine.dispose()
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core import read_replicas
+from app.core.database import async_engine
+from app.core.idempotency import idempotency_store
+from app.core.pool_metrics import pool_stats
+from app.core.rate_limit import rate_limit_backend
+
+
+class CachedProbe:
+    """Dependency check that runs at most once per TTL; concurrent callers share one run"""
+
+    def __init__(self, name: str, check: Callable[[], Awaitable[None]], ttl: float, timeout: float):
+        self.name = name
+        self._check = check
+        self.ttl = ttl
+        self.timeout = timeout
+        self._result: Optional[Dict[str, object]] = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return time.monotonic() - self._checked_at < self.ttl
+
+    async def run(self) -> Dict[str, object]:
+        """Latest probe result, re-probing when the cached one has expired"""
+        if self._fresh():
+            return self._result
+        async with self._lock:
+            if self._fresh():
+                return self._result
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._check(), self.timeout)
+                result = {"status": "ok"}
+            except Exception as error:
+                result = {"status": "error", "error": str(error) or type(error).__name__}
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self._result, self._checked_at = result, time.monotonic()
+            return result
+
+
+async def ping_database() -> None:
+    """SELECT 1 on the primary database"""
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def _create_probes() -> List[CachedProbe]:
+    """Probes for the primary database and each feature configured to use Redis"""
+    ttl, timeout = settings.HEALTH_PROBE_CACHE_SECONDS, settings.HEALTH_PROBE_TIMEOUT_SECONDS
+    probes = [CachedProbe("database", ping_database, ttl, timeout)]
+    # Each feature has its own Redis client and connection pool, so each gets its own probe
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        probes.append(CachedProbe("rate_limit_cache", rate_limit_backend.ping, ttl, timeout))
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        probes.append(CachedProbe("idempotency_cache", idempotency_store.backend.ping, ttl, timeout))
+    if settings.REPLICA_READ_YOUR_WRITES_BACKEND == "redis":
+        probes.append(CachedProbe("write_marker_cache", read_replicas.write_markers.ping, ttl, timeout))
+    return probes
+
+
+probes = _create_probes()
+
+# Requests currently being handled by this worker (middleware runs on the event loop thread)
+_in_flight = 0
+
+
+def in_flight_requests() -> int:
+    """Number of requests this worker is handling right now"""
+    return _in_flight
+
+
+async def track_in_flight(request: Request, call_next):
+    """Middleware: count requests in flight for the readiness check"""
+    global _in_flight
+    _in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        _in_flight -= 1
+
+
+def pool_utilization(stats: Dict[str, object]) -> Optional[float]:
+    """Share of a queue pool's connections (including overflow) that are checked out"""
+    if "size" not in stats:
+        return None
+    capacity = stats["size"] + max(0, stats["max_overflow"])
+    return round(stats["in_use"] / capacity, 3) if capacity else None
+
+
+def overload_reasons(in_flight: int, pools: Dict[str, Dict[str, object]]) -> List[str]:
+    """Why this worker should shed traffic, empty when it has headroom"""
+    reasons = []
+    # The readiness request itself is in flight, hence ">"
+    if settings.HEALTH_MAX_IN_FLIGHT and in_flight > settings.HEALTH_MAX_IN_FLIGHT:
+        reasons.append(f"{in_flight} requests in flight (limit {settings.HEALTH_MAX_IN_FLIGHT})")
+    if settings.HEALTH_MAX_POOL_UTILIZATION:
+        for name, stats in pools.items():
+            utilization = pool_utilization(stats)
+            if utilization is not None and utilization >= settings.HEALTH_MAX_POOL_UTILIZATION:
+                reasons.append(f"pool {name} {utilization:.0%} in use")
+    return reasons
+
+
+async def readiness_report() -> Tuple[bool, Dict[str, object]]:
+    """Run the cached probes and load checks; returns (ready, report)"""
+    results = await asyncio.gather(*(probe.run() for probe in probes))
+    checks = {probe.name: result for probe, result in zip(probes, results)}
+    pools = pool_stats()
+    in_flight = in_flight_requests()
+    overloaded = overload_reasons(in_flight, pools)
+
+    if any(check["status"] != "ok" for check in checks.values()):
+        status = "unavailable"
+    elif overloaded:
+        status = "overloaded"
+    else:
+        status = "ready"
+
+    report = {
+        "status": status,
+        "checks": checks,
+        "in_flight": in_flight,
+        "pools": {
+            name: {**stats, "utilization": pool_utilization(stats)} for name, stats in pools.items()
+        },
+    }
+    if overloaded:
+        report["overloaded"] = overloaded
+    return status == "ready", report
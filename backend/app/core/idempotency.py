@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, NamedTuple, Optional, Set
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.unit_of_work import after_commit, has_pending_changes, on_rollback, save
+from app.models.idempotency import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class StoredResponse(NamedTuple):
+    """First response to an idempotency key and the hash of the request that produced it"""
+
+    request_hash: str
+    status_code: int
+    body: bytes
+
+    def to_response(self) -> Response:
+        return Response(
+            self.body, status_code=self.status_code, media_type="application/json",
+            headers={REPLAYED_HEADER: "true"}
+        )
+
+    def dumps(self) -> str:
+        return json.dumps([self.request_hash, self.status_code, self.body.decode()])
+
+    @classmethod
+    def loads(cls, value: str) -> "StoredResponse":
+        request_hash, status_code, body = json.loads(value)
+        return cls(request_hash, status_code, body.encode())
+
+
+def in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still in progress",
+        headers={"Retry-After": "1"},
+    )
+
+
+class DatabaseIdempotencyBackend:
+    """Keys in idempotency_keys, claimed and completed in the request's own transaction.
+
+    The claim is an INSERT on the unique key, so a duplicate from another
+    worker blocks on the first request's transaction: it replays the stored
+    response once that commits, or goes ahead if it rolled back. That wait
+    happens in the threadpool, never on the event loop. Nothing is left
+    behind when a request fails.
+
+    A duplicate rolls the session back, so the claim has to be the
+    request's first change: guard() refuses a session with staged changes.
+    """
+
+    def __init__(self):
+        self._last_compact = 0.0
+
+    async def claim(self, db: Session, key: str, request_hash: str) -> Optional[StoredResponse]:
+        """Claim key for this request, or return the response it already has"""
+        if db.new or db.dirty or db.deleted or has_pending_changes(db):
+            raise RuntimeError("Claim the idempotency key before the request stages any changes")
+        return await run_in_threadpool(self._claim, db, key, request_hash)
+
+    def _claim(self, db: Session, key: str, request_hash: str) -> Optional[StoredResponse]:
+        now = datetime.utcnow()
+        for _ in range(2):
+            db.add(IdempotencyKey(
+                key=key, request_hash=request_hash,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+            ))
+            try:
+                db.flush()
+            except IntegrityError:
+                db.rollback()
+            else:
+                self._compact(db, now)
+                return None
+
+            row = db.execute(
+                select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body)
+                .where(IdempotencyKey.key == key, IdempotencyKey.expires_at > now)
+            ).first()
+            if row is None:
+                # Expired: forget it and claim again
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now))
+                continue
+            if row.status_code is None:
+                # Committed before completion (unit of work disabled); the first request is still running
+                db.rollback()
+                raise in_progress()
+            db.rollback()
+            return StoredResponse(row.request_hash, row.status_code, row.response_body.encode())
+        raise in_progress()
+
+    def _compact(self, db: Session, now: datetime) -> None:
+        """Purge expired keys, at most every IDEMPOTENCY_COMPACT_SECONDS, along with a claim"""
+        if time.monotonic() - self._last_compact < settings.IDEMPOTENCY_COMPACT_SECONDS:
+            return
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+        self._last_compact = time.monotonic()
+
+    def stage(self, db: Session, key: str, stored: StoredResponse) -> None:
+        """Record the response with the request's changes"""
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(status_code=stored.status_code, response_body=stored.body.decode())
+        )
+        save(db)
+
+    async def release(self, db: Session, key: str) -> None:
+        """Give the key up after a failure: rolling back removes the claim"""
+        db.rollback()
+
+    def discard(self, key: str) -> None:
+        """Give the key up after a failed commit: the claim was rolled back with it"""
+
+
+class RedisIdempotencyBackend:
+    """Keys shared by all workers through Redis.
+
+    A claim is a pending marker set with NX; duplicates poll until the
+    response replaces it, for up to IDEMPOTENCY_WAIT_SECONDS. The response
+    is written after the request commits, so a worker crashing in between
+    leaves a marker that expires after IDEMPOTENCY_LOCK_SECONDS.
+    """
+
+    PENDING = b"pending"
+    POLL_SECONDS = 0.05
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(redis_url)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def claim(self, db: Session, key: str, request_hash: str) -> Optional[StoredResponse]:
+        """Claim key for this request, or return the response it already has"""
+        name = f"idempotency:{key}"
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            if await self._client.set(name, self.PENDING, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS):
+                return None
+            value = await self._client.get(name)
+            if value is not None and value != self.PENDING:
+                return StoredResponse.loads(value.decode())
+            if time.monotonic() >= deadline:
+                raise in_progress()
+            await asyncio.sleep(self.POLL_SECONDS)
+
+    def stage(self, db: Session, key: str, stored: StoredResponse) -> None:
+        """Write the response once the request's changes are committed"""
+        after_commit(db, lambda: self._spawn(self._client.set(
+            f"idempotency:{key}", stored.dumps(), ex=settings.IDEMPOTENCY_TTL_SECONDS
+        )))
+
+    async def release(self, db: Session, key: str) -> None:
+        """Give the key up after a failure so a retry runs again"""
+        await self._client.delete(f"idempotency:{key}")
+
+    def discard(self, key: str) -> None:
+        """Give the key up after a failed commit, from a sync callback"""
+        self._spawn(self._client.delete(f"idempotency:{key}"))
+
+    async def ping(self) -> None:
+        """Round trip to Redis (readiness probe)"""
+        await self._client.ping()
+
+    def _spawn(self, coroutine) -> None:
+        """Run a Redis call in the background, keeping a reference until it is done"""
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class IdempotentRequest:
+    """A request under an Idempotency-Key: a replay, or the first execution whose response is stored"""
+
+    def __init__(self, store: "IdempotencyStore", db: Session, key: Optional[str] = None,
+                 request_hash: Optional[str] = None, replay: Optional[Response] = None):
+        self._store = store
+        self.db = db
+        self.key = key
+        self.request_hash = request_hash
+        self.replay = replay
+
+    def respond(self, content: Any, status_code: int = status.HTTP_200_OK) -> JSONResponse:
+        """JSON response of the first execution, stored for replays when it commits"""
+        response = JSONResponse(jsonable_encoder(content), status_code=status_code)
+        if self.key is not None:
+            self._store.complete(self, StoredResponse(self.request_hash, status_code, bytes(response.body)))
+        return response
+
+
+class IdempotencyStore:
+    """Idempotency keys: completed responses cached in memory, backed by the table or Redis.
+
+    Within a worker, a duplicate of a request still running waits on it
+    instead of reaching the backend, where it would hold a thread waiting on
+    the first request's row lock. Only successful responses are stored; a
+    failed request, including one whose commit fails, releases its key so
+    the client can retry.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._cache = TTLCache(maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_CACHE_TTL_SECONDS)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def request_hash(payload: Any) -> str:
+        """Hash of the request body, to tell a retry from a different request reusing the key"""
+        canonical = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @asynccontextmanager
+    async def guard(self, db: Session, scope: str, key: Optional[str], payload: Any) -> AsyncIterator[IdempotentRequest]:
+        """Run the block once per key in scope; without a key every request runs.
+
+        Enter it before the request changes anything on db: claiming a key
+        may roll the session back.
+        """
+        if not key:
+            yield IdempotentRequest(self, db)
+            return
+
+        request = await self._begin(db, hashlib.sha256(f"{scope}:{key}".encode()).hexdigest(), self.request_hash(payload))
+        if request.replay is not None:
+            yield request
+            return
+        try:
+            yield request
+        except BaseException:
+            try:
+                await self.backend.release(db, request.key)
+            finally:
+                self._finish(request.key)
+            raise
+
+    async def _begin(self, db: Session, key: str, request_hash: str) -> IdempotentRequest:
+        while True:
+            stored = self._cache.get(key)
+            if stored is None:
+                running = self._in_flight.get(key)
+                if running is not None:
+                    try:
+                        await asyncio.wait_for(asyncio.shield(running), settings.IDEMPOTENCY_WAIT_SECONDS)
+                    except asyncio.TimeoutError:
+                        # Its commit may have failed; the next retry goes to the backend
+                        if self._in_flight.get(key) is running:
+                            del self._in_flight[key]
+                        raise in_progress()
+                    continue
+
+                self._in_flight[key] = asyncio.get_running_loop().create_future()
+                try:
+                    stored = await self.backend.claim(db, key, request_hash)
+                except BaseException:
+                    self._finish(key)
+                    raise
+                if stored is None:
+                    return IdempotentRequest(self, db, key, request_hash)
+                self._cache.set(key, stored)
+                self._finish(key)
+
+            if stored.request_hash != request_hash:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used with a different request",
+                )
+            return IdempotentRequest(self, db, key, request_hash, replay=stored.to_response())
+
+    def complete(self, request: IdempotentRequest, stored: StoredResponse) -> None:
+        """Store the response with the request's changes; duplicates replay it after the commit"""
+        self.backend.stage(request.db, request.key, stored)
+
+        def committed():
+            self._cache.set(request.key, stored)
+            self._finish(request.key)
+
+        def rolled_back():
+            self.backend.discard(request.key)
+            self._finish(request.key)
+
+        after_commit(request.db, committed)
+        on_rollback(request.db, rolled_back)
+
+    def _finish(self, key: str) -> None:
+        """Wake duplicates waiting on this worker's execution of key"""
+        running = self._in_flight.pop(key, None)
+        if running is not None and not running.done():
+            running.set_result(None)
+
+
+def _create_backend():
+    """Create the configured idempotency backend"""
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        return RedisIdempotencyBackend(settings.REDIS_URL)
+    return DatabaseIdempotencyBackend()
+
+
+idempotency_store = IdempotencyStore(_create_backend())
@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolMetrics:
+    """Checkout wait and connection counters for one engine's pool (per worker process)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float) -> None:
+        """Record the time spent waiting for a connection"""
+        with self._lock:
+            self.waits += 1
+            self.checkout_wait_total += seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        """Record a checkout that gave up after pool_timeout"""
+        with self._lock:
+            self.timeouts += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        """Pool event: a connection was handed out"""
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        """Pool event: a connection was returned"""
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def on_connect(self, dbapi_connection, connection_record) -> None:
+        """Pool event: a new DBAPI connection was opened"""
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        """Pool event: a connection was invalidated (e.g. failed pre-ping)"""
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, object]:
+        """Current counters plus the pool's own size/overflow figures"""
+        with self._lock:
+            stats = {
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": round(self.checkout_wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+                max_overflow=pool._max_overflow,
+            )
+        return stats
+
+
+# Metrics per engine name ("primary", "async", ...), read by the diagnostics endpoint
+pool_metrics: Dict[str, PoolMetrics] = {}
+_instrumented_engines: Dict[str, Engine] = {}
+
+
+def timed_pool_class(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """Subclass a queue pool so checkouts record their wait time in metrics"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        finally:
+            metrics.record_wait(time.perf_counter() - start)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def instrument_engine(name: str, engine: Engine, metrics: PoolMetrics) -> None:
+    """Register pool events for an engine and publish its metrics under name"""
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+    event.listen(engine, "connect", metrics.on_connect)
+    event.listen(engine, "invalidate", metrics.on_invalidate)
+    pool_metrics[name] = metrics
+    _instrumented_engines[name] = engine
+
+
+def pool_stats() -> Dict[str, Dict[str, object]]:
+    """Snapshot of every instrumented pool"""
+    return {name: metrics.snapshot(_instrumented_engines[name].pool) for name, metrics in pool_metrics.items()}
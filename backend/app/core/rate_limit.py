@@ -0,0 +1,145 @@
+import math
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Per-limiter counters of allowed and rejected requests (per worker process)
+rate_limit_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"allowed": 0, "rejected": 0})
+
+
+def parse_rate(rate: str) -> Tuple[float, int]:
+    """Parse a rate like '10/minute' into (tokens per second, bucket capacity)"""
+    count, _, period = rate.partition("/")
+    seconds = _PERIODS[period.strip().rstrip("s")]
+    capacity = int(count)
+    return capacity / seconds, capacity
+
+
+class MemoryRateLimitBackend:
+    """In-process token buckets; also the stand-in for the shared backend in tests"""
+
+    def __init__(self, maxsize: int = 100000):
+        self._buckets = TTLCache(maxsize=maxsize)
+
+    async def hit(self, key: str, rate: float, capacity: int, cost: int = 1) -> Tuple[bool, float]:
+        """Take cost tokens (0 only looks); return (allowed, seconds until a token is available)"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        if tokens >= 1:
+            allowed, retry_after = True, 0.0
+            tokens -= cost
+        else:
+            allowed, retry_after = False, (1 - tokens) / rate
+
+        # A bucket untouched for longer than its refill time is full again, so it can expire
+        self._buckets.set(key, (tokens, now), ttl=capacity / rate)
+        return allowed, retry_after
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared by all workers through Redis"""
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - cost
+        allowed = 1
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(retry_after)}
+    """
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(redis_url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def hit(self, key: str, rate: float, capacity: int, cost: int = 1) -> Tuple[bool, float]:
+        """Take cost tokens (0 only looks); return (allowed, seconds until a token is available)"""
+        allowed, retry_after = await self._script(
+            keys=[f"ratelimit:{key}"], args=[rate, capacity, time.time(), cost]
+        )
+        return bool(allowed), float(retry_after)
+
+    async def ping(self) -> None:
+        """Round trip to Redis (readiness probe)"""
+        await self._client.ping()
+
+
+def _create_backend():
+    """Create the configured rate limit backend"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.REDIS_URL)
+    return MemoryRateLimitBackend()
+
+
+rate_limit_backend = _create_backend()
+
+
+def client_ip(request: Request) -> str:
+    """Key requests by client address"""
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """Token bucket rate limit usable as a FastAPI dependency.
+
+    As a dependency it keys requests with ``key_func`` (client IP by
+    default); ``check`` can be awaited directly for other keys such as a
+    username. With cost=0 it only checks that the bucket is not empty, so
+    a limit can be charged for some outcomes only (e.g. failed logins).
+    """
+
+    def __init__(self, name: str, rate: str, key_func: Callable[[Request], str] = client_ip):
+        self.name = name
+        self.rate, self.capacity = parse_rate(rate)
+        self.key_func = key_func
+
+    async def __call__(self, request: Request) -> None:
+        await self.check(self.key_func(request))
+
+    async def check(self, key: Optional[str], cost: int = 1) -> None:
+        """Consume cost tokens for key or raise 429 with Retry-After"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        allowed, retry_after = await rate_limit_backend.hit(
+            f"{self.name}:{key}", self.rate, self.capacity, cost
+        )
+        if allowed:
+            rate_limit_stats[self.name]["allowed"] += 1
+            return
+
+        rate_limit_stats[self.name]["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+auth_rate_limit = RateLimiter("auth", settings.RATE_LIMIT_AUTH)
+login_user_rate_limit = RateLimiter("login_user", settings.RATE_LIMIT_LOGIN_USER)
+catalog_rate_limit = RateLimiter("catalog", settings.RATE_LIMIT_CATALOG)
@@ -0,0 +1,249 @@
+import hashlib
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy import Delete, Insert, Select, Update, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+# Cookie with the time (unix seconds) of the client's last write: the
+# fallback for anonymous browser clients, whose writes have no principal
+LAST_WRITE_COOKIE = "last_write"
+
+
+class ReadState:
+    """Read-your-writes state of the current request"""
+
+    __slots__ = ("recent_write", "wrote")
+
+    def __init__(self, recent_write: bool):
+        self.recent_write = recent_write  # The client wrote within REPLICA_READ_YOUR_WRITES_SECONDS
+        self.wrote = False  # This request wrote
+
+
+# Set by track_read_client; sync dependencies run on a copy of the context, which still shares the object
+_read_state: ContextVar[Optional[ReadState]] = ContextVar("read_state", default=None)
+
+
+class MemoryWriteMarkers:
+    """Principals that wrote recently, per worker process (single-worker deployments and tests)"""
+
+    def __init__(self, maxsize: int = 100000):
+        self._markers = TTLCache(maxsize=maxsize)
+
+    async def wrote_recently(self, principal: str) -> bool:
+        return self._markers.get(principal) is not None
+
+    async def mark(self, principal: str, seconds: int) -> None:
+        self._markers.set(principal, True, ttl=seconds)
+
+
+class RedisWriteMarkers:
+    """Principals that wrote recently, shared by all workers through Redis"""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(redis_url)
+
+    async def wrote_recently(self, principal: str) -> bool:
+        return bool(await self._client.exists(f"lastwrite:{principal}"))
+
+    async def mark(self, principal: str, seconds: int) -> None:
+        await self._client.set(f"lastwrite:{principal}", 1, ex=seconds)
+
+    async def ping(self) -> None:
+        """Round trip to Redis (readiness probe)"""
+        await self._client.ping()
+
+
+def _create_write_markers():
+    """Create the configured write marker store"""
+    if settings.REPLICA_READ_YOUR_WRITES_BACKEND == "redis":
+        return RedisWriteMarkers(settings.REDIS_URL)
+    return MemoryWriteMarkers()
+
+
+write_markers = _create_write_markers()
+
+
+class ReplicaRouter:
+    """Round-robin over read replicas that passed their last health check.
+
+    Health checks run on a background thread every check_interval seconds,
+    so a dead replica never stalls a request; until a replica's first check
+    it is left out of rotation. Checks use probe_engines when routed engines
+    cannot connect from a plain thread (the sync side of async engines).
+    """
+
+    def __init__(self, engines: List[Engine], check_interval: float, probe_engines: Optional[List[Engine]] = None):
+        self.engines = engines
+        self.probe_engines = probe_engines or engines
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next = 0
+        self._healthy: Dict[int, bool] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._checker: Optional[threading.Thread] = None
+
+    def _probe(self, index: int) -> bool:
+        """Run SELECT 1 on a replica and remember the outcome"""
+        try:
+            with self.probe_engines[index].connect() as connection:
+                connection.execute(text("SELECT 1"))
+            healthy = True
+        except Exception:
+            healthy = False
+        self._healthy[index] = healthy
+        self._checked_at[index] = time.monotonic()
+        return healthy
+
+    def _check_forever(self) -> None:
+        while True:
+            for index in range(len(self.engines)):
+                self._probe(index)
+            time.sleep(self.check_interval)
+
+    def _ensure_checker(self) -> None:
+        """Start the health check thread (again after a fork, which does not copy threads)"""
+        if self._checker is not None and self._checker.is_alive():
+            return
+        with self._lock:
+            if self._checker is None or not self._checker.is_alive():
+                self._checker = threading.Thread(target=self._check_forever, name="replica-health", daemon=True)
+                self._checker.start()
+
+    def mark_down(self, engine: Engine) -> None:
+        """Take a replica out of rotation until its next health check"""
+        for index, replica in enumerate(self.engines):
+            if replica is engine:
+                self._healthy[index] = False
+                self._checked_at[index] = time.monotonic()
+
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica, or None if there is none"""
+        self._ensure_checker()
+        for _ in range(len(self.engines)):
+            with self._lock:
+                index = self._next
+                self._next = (self._next + 1) % len(self.engines)
+            if self._healthy.get(index, False):
+                return self.engines[index]
+        return None
+
+    def status(self) -> List[Dict[str, object]]:
+        """Health of every replica as of its last check"""
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self._healthy.get(index),
+            }
+            for index, engine in enumerate(self.engines)
+        ]
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica and everything else to the primary"""
+
+    def __init__(self, *args, router: Optional[ReplicaRouter] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self._wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """Pick the primary or a replica for a statement"""
+        if self.router is None or not self.router.engines:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+        if isinstance(clause, StatementLambdaElement):
+            # Cached lambda_stmt builders: route by the statement they produce
+            clause = clause._resolved
+        state = _read_state.get()
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            # Keep this session, and the client's next requests, on the primary
+            self._wrote = True
+            if state is not None:
+                state.wrote = True
+        elif (
+            isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not self._wrote
+            and (state is None or not state.recent_write)
+        ):
+            replica = self.router.choose()
+            if replica is not None:
+                return replica
+
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def request_principal(request: Request) -> Optional[str]:
+    """Who sent the request: the bearer token's user or the API key, whatever the token's age"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{decode_token(token)['sub']}"
+        except (HTTPException, KeyError):
+            return None
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return f"api_key:{hashlib.sha256(api_key.encode()).hexdigest()}"
+    return None
+
+
+def _cookie_is_recent(cookie: Optional[str]) -> bool:
+    """Whether a last-write cookie is within the read-your-writes window (bad or future values are ignored)"""
+    try:
+        age = time.time() - float(cookie)
+    except (TypeError, ValueError):
+        return False
+    return 0 <= age < settings.REPLICA_READ_YOUR_WRITES_SECONDS
+
+
+async def _principal_wrote_recently(principal: Optional[str]) -> bool:
+    if principal is None:
+        return False
+    try:
+        return await write_markers.wrote_recently(principal)
+    except Exception:
+        # Unknown: stay on the primary rather than risk a stale read
+        logger.warning("Write marker lookup failed; reading from the primary", exc_info=True)
+        return True
+
+
+async def track_read_client(request: Request, call_next):
+    """Middleware: keep reads on the primary after the client's writes, on every worker.
+
+    Writes are remembered per principal (user or API key) in the shared
+    write marker store, so token refreshes, other workers and clients
+    without cookies are covered; the cookie covers anonymous clients.
+    """
+    principal = request_principal(request)
+    state = ReadState(
+        _cookie_is_recent(request.cookies.get(LAST_WRITE_COOKIE)) or await _principal_wrote_recently(principal)
+    )
+    token = _read_state.set(state)
+    try:
+        response = await call_next(request)
+    finally:
+        _read_state.reset(token)
+    if state.wrote:
+        window = settings.REPLICA_READ_YOUR_WRITES_SECONDS
+        if principal is not None:
+            try:
+                await write_markers.mark(principal, window)
+            except Exception:
+                logger.warning("Could not record the write marker of %s", principal, exc_info=True)
+        response.set_cookie(LAST_WRITE_COOKIE, f"{time.time():.3f}", max_age=window, httponly=True, samesite="lax")
+    return response
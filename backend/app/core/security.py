@@ -1,12 +1,37 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+import uuid
+from typing import Optional, Tuple, Union
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes using a non-default scheme or different cost parameters report
+# needs_update() and are transparently rehashed on the next successful login
+pwd_context = CryptContext(
+    schemes=settings.PASSWORD_HASH_SCHEMES,
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_pending_password_hashes = 0
+
+# Verified token payloads keyed by token digest; entries never outlive the token's exp
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -17,7 +42,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -26,11 +51,22 @@ def create_refresh_token(data: dict):
     """Create JWT refresh token"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def generate_api_key() -> Tuple[str, str]:
+    """Generate a new API key; returns (key, display prefix)"""
+    prefix = secrets.token_hex(4)
+    return f"dpk_{prefix}_{secrets.token_urlsafe(32)}", prefix
+
+
+def hash_api_key(key: str) -> str:
+    """Keyed hash of an API key (fast on purpose: keys are high-entropy, unlike passwords)"""
+    return hmac.new(settings.SECRET_KEY.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -41,14 +77,71 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def decode_token(token: str) -> dict:
-    """Decode and verify JWT token"""
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify password and return a replacement hash if the stored one is outdated"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def verify_token(token: str) -> dict:
+    """Decode and verify JWT token signature and claims"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
-    except JWTError:
+    except (JWTError, AttributeError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def _run_password_hash(func, *args):
+    """Run a password hashing call in the hash pool, rejecting when the queue is full"""
+    global _pending_password_hashes
+    if _pending_password_hashes >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending_password_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_hash_executor, func, *args)
+    finally:
+        _pending_password_hashes -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash without blocking the event loop"""
+    return await _run_password_hash(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify password and compute a rehash if needed, without blocking the event loop"""
+    return await _run_password_hash(verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash without blocking the event loop"""
+    return await _run_password_hash(get_password_hash, password)
+
+
+def decode_token(token: str) -> dict:
+    """Decode and verify JWT token, reusing recently verified payloads"""
+    if not token:
+        return verify_token(token)
+
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return dict(payload)
+        token_cache.delete(key)
+
+    payload = verify_token(token)
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return dict(payload)
@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements longer than this are truncated in logs and aggregates
+_STATEMENT_PREVIEW = 300
+
+
+class RequestQueryStats:
+    """SQL executed while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """Add one executed statement"""
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def repeated_statements(self) -> Dict[str, int]:
+        """Statements executed often enough to look like N+1 queries"""
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= settings.SQL_N_PLUS_ONE_THRESHOLD
+        }
+
+
+class SqlStats:
+    """Per-route SQL aggregates across requests (per worker process)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[str, Dict[str, float]] = {}
+        self.slow_queries = 0
+        self.n_plus_one: Counter = Counter()
+
+    def record_slow_query(self) -> None:
+        """Count a statement over the slow query threshold"""
+        with self._lock:
+            self.slow_queries += 1
+
+    def record_request(self, route: str, stats: RequestQueryStats, repeated: Dict[str, int]) -> None:
+        """Fold one request's SQL into its route's aggregates"""
+        with self._lock:
+            totals = self.routes.setdefault(
+                route, {"requests": 0, "queries": 0, "db_time": 0.0, "max_queries": 0, "max_db_time": 0.0, "n_plus_one": 0}
+            )
+            totals["requests"] += 1
+            totals["queries"] += stats.count
+            totals["db_time"] += stats.total_time
+            totals["max_queries"] = max(totals["max_queries"], stats.count)
+            totals["max_db_time"] = max(totals["max_db_time"], stats.total_time)
+            if repeated:
+                totals["n_plus_one"] += 1
+                for statement in repeated:
+                    self.n_plus_one[f"{route}: {statement[:_STATEMENT_PREVIEW]}"] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        """Aggregates for the diagnostics endpoint"""
+        with self._lock:
+            routes = {
+                route: {
+                    "requests": totals["requests"],
+                    "queries_avg": round(totals["queries"] / totals["requests"], 2),
+                    "queries_max": totals["max_queries"],
+                    "db_time_avg_ms": round(totals["db_time"] / totals["requests"] * 1000, 3),
+                    "db_time_max_ms": round(totals["max_db_time"] * 1000, 3),
+                    "n_plus_one_requests": totals["n_plus_one"],
+                }
+                for route, totals in self.routes.items()
+            }
+            return {
+                "slow_queries": self.slow_queries,
+                "routes": routes,
+                "n_plus_one": dict(self.n_plus_one.most_common(20)),
+            }
+
+
+sql_stats = SqlStats()
+
+# Statistics of the request being served, if any
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        sql_stats.record_slow_query()
+        logger.warning(
+            "Slow query (%.1f ms): %s parameters=%r",
+            duration * 1000, statement[:_STATEMENT_PREVIEW], parameters
+        )
+
+
+def instrument_sql(engine: Engine) -> None:
+    """Time every statement executed on an engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing_enabled() -> bool:
+    """Whether responses carry the Server-Timing header; it reveals query counts and DB time to clients"""
+    return settings.SQL_SERVER_TIMING_HEADER or settings.ENVIRONMENT == "development"
+
+
+def _route_name(request: Request) -> str:
+    """Method and route template, so /products/1 and /products/2 aggregate together"""
+    route = request.scope.get("route")
+    return f"{request.method} {route.path if route is not None else request.url.path}"
+
+
+async def track_request_sql(request: Request, call_next):
+    """Middleware: collect SQL stats for the request, reported in Server-Timing where enabled"""
+    stats = RequestQueryStats()
+    token = _request_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_stats.reset(token)
+
+    route = _route_name(request)
+    repeated = stats.repeated_statements()
+    for statement, count in repeated.items():
+        logger.warning("Possible N+1 on %s: %d executions of %s", route, count, statement[:_STATEMENT_PREVIEW])
+    sql_stats.record_request(route, stats, repeated)
+
+    if server_timing_enabled():
+        response.headers["Server-Timing"] = f"db;desc=\"{stats.count} queries\";dur={stats.total_time * 1000:.1f}"
+    return response
@@ -0,0 +1,166 @@
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Union
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Sessions opened by the current request; set by UnitOfWorkRoute, appended to by get_db/get_async_db.
+# Sync dependencies run in a threadpool on a copy of the context, which still shares this list.
+_request_sessions: ContextVar[Optional[list]] = ContextVar("request_sessions", default=None)
+
+# Session.info keys
+_UNIT_OF_WORK = "unit_of_work"
+_PENDING = "unit_of_work_pending"
+_AFTER_COMMIT = "unit_of_work_after_commit"
+_ON_ROLLBACK = "unit_of_work_on_rollback"
+
+
+def join_request(db: Union[Session, AsyncSession]) -> None:
+    """Enlist a session in the current request's unit of work, if there is one"""
+    sessions = _request_sessions.get()
+    if sessions is not None:
+        db.info[_UNIT_OF_WORK] = True
+        sessions.append(db)
+
+
+def _deferred(db: Union[Session, AsyncSession], immediate: bool) -> bool:
+    return not immediate and db.info.get(_UNIT_OF_WORK, False)
+
+
+def _committed(db: Union[Session, AsyncSession]) -> None:
+    """Clear the pending flag and run callbacks waiting for the commit"""
+    db.info.pop(_PENDING, None)
+    db.info.pop(_ON_ROLLBACK, None)
+    for callback in db.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+
+def save(db: Session, *instances, immediate: bool = False) -> None:
+    """Persist the session's changes.
+
+    Inside a request's unit of work this only flushes: statements run,
+    constraint violations surface and ids are assigned, and the request
+    commits once when the endpoint has returned. Otherwise, or with
+    immediate=True, it commits now and refreshes the given instances.
+    """
+    if _deferred(db, immediate):
+        db.flush()
+        db.info[_PENDING] = True
+        return
+    db.commit()
+    _committed(db)
+    for instance in instances:
+        db.refresh(instance)
+
+
+async def save_async(db: AsyncSession, *instances, immediate: bool = False) -> None:
+    """Persist an async session's changes; see save"""
+    if _deferred(db, immediate):
+        await db.flush()
+        db.info[_PENDING] = True
+        return
+    await db.commit()
+    _committed(db)
+    for instance in instances:
+        await db.refresh(instance)
+
+
+def after_commit(db: Union[Session, AsyncSession], callback: Callable[[], None]) -> None:
+    """Run callback once the session's changes are committed (right away if nothing is pending).
+
+    Cache invalidations go here, so no other request can re-cache a row
+    between the flush and the request's commit.
+    """
+    if db.info.get(_PENDING):
+        db.info.setdefault(_AFTER_COMMIT, []).append(callback)
+    else:
+        callback()
+
+
+def has_pending_changes(db: Union[Session, AsyncSession]) -> bool:
+    """Whether the session holds flushed changes waiting for the request's commit"""
+    return bool(db.info.get(_PENDING))
+
+
+def on_rollback(db: Union[Session, AsyncSession], callback: Callable[[], None]) -> None:
+    """Run callback if the session's pending changes are discarded instead of committed.
+
+    Undoes what was set up alongside the changes, such as in-memory claims,
+    when the endpoint raises or the request's commit fails. Does nothing if
+    no changes are pending.
+    """
+    if db.info.get(_PENDING):
+        db.info.setdefault(_ON_ROLLBACK, []).append(callback)
+
+
+def release_connection(db: Session) -> None:
+    """End the read transaction before a slow await so the pooled connection is free.
+
+    Keeps the transaction when it holds changes staged for the unit of work.
+    """
+    if not db.info.get(_PENDING):
+        db.rollback()
+
+
+async def release_connection_async(db: AsyncSession) -> None:
+    """End the read transaction before a slow await; see release_connection"""
+    if not db.info.get(_PENDING):
+        await db.rollback()
+
+
+async def commit_request(sessions: List[Union[Session, AsyncSession]]) -> None:
+    """Commit every session that staged changes during the request"""
+    for db in sessions:
+        if not db.info.get(_PENDING):
+            continue
+        if isinstance(db, AsyncSession):
+            await db.commit()
+        else:
+            # Inline like the rest of the request's work on this session: handing
+            # the commit to a thread would let other requests run while this
+            # transaction holds the write lock
+            db.commit()
+        _committed(db)
+
+
+def discard_request(sessions: List[Union[Session, AsyncSession]]) -> None:
+    """Give up the changes the request left uncommitted; get_db rolls them back on close"""
+    for db in sessions:
+        db.info.pop(_PENDING, None)
+        db.info.pop(_AFTER_COMMIT, None)
+        for callback in db.info.pop(_ON_ROLLBACK, []):
+            callback()
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Route whose sessions commit once, after the endpoint and response serialization.
+
+    The commit happens before the response is sent, so a failed commit turns
+    into an error response instead of a success for lost changes. If the
+    endpoint raises or a commit fails, nothing more is committed, on_rollback
+    callbacks run and get_db rolls back on close.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request):
+            if not settings.UNIT_OF_WORK_ENABLED:
+                return await handler(request)
+            sessions = []
+            token = _request_sessions.set(sessions)
+            try:
+                try:
+                    response = await handler(request)
+                finally:
+                    _request_sessions.reset(token)
+                await commit_request(sessions)
+            except BaseException:
+                discard_request(sessions)
+                raise
+            return response
+
+        return unit_of_work_handler
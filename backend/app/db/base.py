@@ -3,6 +3,9 @@ from app.models.user import User
 from app.models.product import Product, ProductCategory
 from app.models.order import Order, OrderItem
 from app.models.payment import Payment
+from app.models.token import RevokedToken
+from app.models.api_key import ApiKey
+from app.models.idempotency import IdempotencyKey
 from app.core.database import Base
 
 # This ensures all models are imported when Alembic runs
@@ -1,11 +1,15 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import os
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import engine, dispose_engines
+from app.core.health import readiness_report, track_in_flight
+from app.core.read_replicas import track_read_client
+from app.core.sql_instrumentation import track_request_sql
 # Import base first to ensure all models are loaded
 from app.db.base import Base
 from app.api.v1.router import api_router
@@ -16,11 +20,16 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("Starting up...")
+    # Instance ids derived from host names can collide across hosts, and a
+    # colliding order number fails the order; deployments assign them
+    if settings.ORDER_NUMBER_INSTANCE_ID is None and settings.ENVIRONMENT != "development":
+        raise RuntimeError("ORDER_NUMBER_INSTANCE_ID must be set outside development (0-31, unique per host or container)")
     # Create upload directory if it doesn't exist
     os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
     yield
     # Shutdown
     print("Shutting down...")
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -42,6 +51,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# In-flight request count for the readiness check
+app.middleware("http")(track_in_flight)
+
+# Per-request SQL stats (slow query and N+1 logging, Server-Timing header where enabled)
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.middleware("http")(track_request_sql)
+
+# Read-your-writes tracking for replica routing (only needed when replicas are configured)
+if settings.DATABASE_REPLICA_URLS:
+    app.middleware("http")(track_read_client)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -66,6 +86,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the worker is up and its event loop is responsive"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: dependencies reachable and the worker has headroom, 503 otherwise"""
+    ready, report = await readiness_report()
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Owner relationship
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user = relationship("User", back_populates="api_keys")
+    
+    # Key details; only a keyed hash of the secret is stored
+    name = Column(String(100), nullable=False)
+    prefix = Column(String(16), nullable=False)  # Shown to identify the key
+    key_hash = Column(String(64), unique=True, index=True, nullable=False)
+    scopes = Column(String(255), nullable=False)  # Space-separated, e.g. "catalog:read catalog:write"
+    is_active = Column(Boolean, default=True)
+    
+    # Usage
+    usage_count = Column(Integer, default=0)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<ApiKey(id={self.id}, prefix='{self.prefix}', user_id={self.user_id})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # sha256 of the scope (e.g. the user's orders) and the client's key, so rows stay fixed-size
+    key = Column(String(64), unique=True, index=True, nullable=False)
+    request_hash = Column(String(64), nullable=False)
+
+    # Written in the same transaction as the request's changes
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+
+    # Rows are compacted away once the key may no longer be replayed
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<IdempotencyKey(id={self.id}, status_code={self.status_code})>"
@@ -20,7 +20,7 @@ class Order(Base):
     order_number = Column(String(50), unique=True, index=True, nullable=False)
     
     # User relationship
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     user = relationship("User", back_populates="orders")
     
     # Order details
@@ -59,11 +59,11 @@ class OrderItem(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Order relationship
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True, nullable=False)
     order = relationship("Order", back_populates="order_items")
     
     # Product relationship
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), index=True, nullable=False)
     product = relationship("Product", back_populates="order_items")
     
     # Item details
@@ -27,7 +27,7 @@ class Payment(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Order relationship
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True, nullable=False)
     order = relationship("Order", back_populates="payments")
     
     # Payment details
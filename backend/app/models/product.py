@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, DECIMAL, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -66,7 +66,7 @@ class Product(Base):
     rating = Column(DECIMAL(3, 2), default=0.0)  # Average rating
     
     # Category relationship
-    category_id = Column(Integer, ForeignKey("product_categories.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("product_categories.id"), index=True, nullable=True)
     category = relationship("ProductCategory", back_populates="products")
     
     # Timestamps
@@ -76,5 +76,13 @@ class Product(Base):
     # Relationships
     order_items = relationship("OrderItem", back_populates="product")
     
+    __table_args__ = (
+        # Catalog listings: active products, newest first (partial where supported)
+        Index(
+            "ix_products_active_created_at", created_at,
+            sqlite_where=is_active == True, postgresql_where=is_active == True
+        ),
+    )
+    
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', price={self.price})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    
+    # Rows are compacted away once the token would have expired anyway
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    # Workers sync by revocation time
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    def __repr__(self):
+        return f"<RevokedToken(id={self.id}, jti='{self.jti}')>"
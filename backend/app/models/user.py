@@ -16,6 +16,9 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)
     is_verified = Column(Boolean, default=False)
     
+    # Bumped to invalidate every outstanding access token (deactivation, role change)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Profile information
     phone = Column(String(20), nullable=True)
     avatar = Column(String(255), nullable=True)
@@ -28,6 +31,7 @@ class User(Base):
     
     # Relationships
     orders = relationship("Order", back_populates="user")
+    api_keys = relationship("ApiKey", back_populates="user")
     
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', username='{self.username}')>"
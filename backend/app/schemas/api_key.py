@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Optional, List, Literal
+from datetime import datetime
+
+ApiKeyScope = Literal["catalog:read", "catalog:write"]
+
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    scopes: List[ApiKeyScope] = Field(default_factory=lambda: ["catalog:read"], min_length=1)
+    expires_in_days: Optional[int] = Field(None, ge=1, le=3650)
+
+
+class ApiKey(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    user_id: int
+    name: str
+    prefix: str
+    scopes: List[str]
+    is_active: bool
+    usage_count: int
+    last_used_at: Optional[datetime] = None
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+
+    @field_validator("scopes", mode="before")
+    @classmethod
+    def split_scopes(cls, value):
+        if isinstance(value, str):
+            return value.split()
+        return value
+
+
+class ApiKeyPrincipal(ApiKey):
+    """An authenticated key with its owner's current state (never returned by the API)"""
+    owner_is_active: bool
+    owner_is_superuser: bool
+    owner_token_version: int
+
+
+class ApiKeyCreated(ApiKey):
+    key: str  # Only returned once, at creation
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.order import OrderStatus
+from app.models.payment import PaymentMethod
+
+
+class OrderItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(1, ge=1, le=100)
+
+
+class OrderCreate(BaseModel):
+    items: List[OrderItemCreate] = Field(..., min_length=1, max_length=100)
+    payment_method: PaymentMethod = PaymentMethod.STRIPE
+    notes: Optional[str] = Field(None, max_length=1000)
+
+
+class OrderItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    product_id: int
+    product_name: str
+    product_price: Decimal
+    quantity: int
+    subtotal: Decimal
+    download_count: int
+    download_limit: int
+    created_at: datetime
+
+
+class Order(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    order_number: str
+    status: OrderStatus
+    total_amount: Decimal
+    currency: str
+    customer_email: str
+    customer_name: str
+    payment_method: Optional[str] = None
+    payment_status: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    order_items: List[OrderItem] = []
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
@@ -111,3 +111,30 @@ class ProductSearch(BaseModel):
     max_price: Optional[Decimal] = None
     is_featured: Optional[bool] = None
     is_free: Optional[bool] = None
+
+
+class ProductBulkFilter(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    category_id: Optional[int] = None
+    min_price: Optional[Decimal] = Field(None, ge=0)
+    max_price: Optional[Decimal] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        # An empty filter would touch the whole catalog; require an explicit criterion
+        if self.ids is None and self.category_id is None and self.min_price is None and self.max_price is None:
+            raise ValueError("At least one filter criterion is required")
+        return self
+
+
+class ProductBulkUpdate(BaseModel):
+    filter: ProductBulkFilter
+    patch: ProductUpdate
+
+
+class ProductBulkDelete(BaseModel):
+    filter: ProductBulkFilter
+
+
+class ProductBulkResult(BaseModel):
+    affected: int
@@ -44,6 +44,7 @@ class User(UserBase):
 
 class UserInDB(User):
     hashed_password: str
+    token_version: int = 0
 
 
 # Authentication schemas
@@ -56,6 +57,9 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: Optional[int] = None
     email: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+    token_version: int = 0
 
 
 class LoginRequest(BaseModel):
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional, List, Tuple
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import generate_api_key, hash_api_key
+from app.core.unit_of_work import after_commit, save
+from app.models.api_key import ApiKey
+from app.models.user import User
+from app.schemas.api_key import ApiKeyCreate, ApiKey as ApiKeySchema, ApiKeyPrincipal
+
+# Detached snapshots of active keys and their owners' state keyed by key hash;
+# cleared when any user's state changes (UserService._invalidate)
+api_key_cache = TTLCache(maxsize=10000, ttl=settings.API_KEY_CACHE_TTL_SECONDS)
+
+# Uses counted in memory and written to api_keys in batches
+_usage_lock = threading.Lock()
+_pending_usage: Counter = Counter()
+_last_usage_flush = time.monotonic()
+
+
+class ApiKeyService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_user_api_keys(self, user_id: int) -> List[ApiKey]:
+        """Get all keys owned by a user"""
+        return self.db.query(ApiKey).filter(ApiKey.user_id == user_id).order_by(ApiKey.id).all()
+
+    def create_api_key(self, user_id: int, key_data: ApiKeyCreate) -> Tuple[ApiKey, str]:
+        """Create a key; returns the model and the raw key (not stored)"""
+        raw_key, prefix = generate_api_key()
+        expires_at = None
+        if key_data.expires_in_days:
+            expires_at = datetime.utcnow() + timedelta(days=key_data.expires_in_days)
+
+        api_key = ApiKey(
+            user_id=user_id,
+            name=key_data.name,
+            prefix=prefix,
+            key_hash=hash_api_key(raw_key),
+            scopes=" ".join(sorted(set(key_data.scopes))),
+            expires_at=expires_at
+        )
+        
+        self.db.add(api_key)
+        save(self.db, api_key)
+        return api_key, raw_key
+
+    def revoke_api_key(self, user_id: int, key_id: int) -> bool:
+        """Deactivate one of a user's keys"""
+        api_key = self.db.query(ApiKey).filter(
+            ApiKey.id == key_id, ApiKey.user_id == user_id
+        ).first()
+        if not api_key:
+            return False
+
+        key_hash = api_key.key_hash
+        api_key.is_active = False
+        save(self.db)
+        after_commit(self.db, lambda: api_key_cache.delete(key_hash))
+        return True
+
+    def authenticate(self, raw_key: str) -> Optional[ApiKeyPrincipal]:
+        """Resolve a raw key to an active key snapshot: one hash plus a cache lookup.
+
+        Keys of deactivated owners are rejected; the snapshot carries the
+        owner's current admin flag and token version for authorization.
+        """
+        key_hash = hash_api_key(raw_key)
+        snapshot = api_key_cache.get(key_hash)
+        if snapshot is None:
+            row = self.db.execute(
+                select(ApiKey, User.is_active, User.is_superuser, User.token_version)
+                .join(User, User.id == ApiKey.user_id)
+                .where(ApiKey.key_hash == key_hash, ApiKey.is_active == True)
+            ).first()
+            if row is None:
+                return None
+            api_key, owner_is_active, owner_is_superuser, owner_token_version = row
+            snapshot = ApiKeyPrincipal(
+                **ApiKeySchema.model_validate(api_key).model_dump(),
+                owner_is_active=owner_is_active,
+                owner_is_superuser=owner_is_superuser,
+                owner_token_version=owner_token_version or 0,
+            )
+            api_key_cache.set(key_hash, snapshot)
+
+        if not snapshot.owner_is_active:
+            return None
+        if snapshot.expires_at and snapshot.expires_at.replace(tzinfo=None) <= datetime.utcnow():
+            return None
+
+        self.record_usage(snapshot.id)
+        return snapshot
+
+    def record_usage(self, key_id: int) -> None:
+        """Count a use of a key, flushing counters to the database when due"""
+        with _usage_lock:
+            _pending_usage[key_id] += 1
+        if time.monotonic() - _last_usage_flush >= settings.API_KEY_USAGE_FLUSH_SECONDS:
+            self.flush_usage()
+
+    def flush_usage(self) -> None:
+        """Write pending usage counts with one executemany UPDATE"""
+        global _last_usage_flush
+        with _usage_lock:
+            pending = dict(_pending_usage)
+            _pending_usage.clear()
+            _last_usage_flush = time.monotonic()
+        if not pending:
+            return
+
+        table = ApiKey.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("key_id"))
+            .values(usage_count=table.c.usage_count + bindparam("uses"), last_used_at=datetime.utcnow())
+        )
+        self.db.execute(stmt, [{"key_id": key_id, "uses": uses} for key_id, uses in pending.items()])
+        # The counts already left the in-memory buffer; a failing request must not roll them back
+        save(self.db, immediate=True)
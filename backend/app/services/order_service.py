@@ -0,0 +1,136 @@
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Import base to ensure all models are loaded
+from app.db.base import Base
+from app.core.config import settings
+from app.core.unit_of_work import save
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.payment import Payment, PaymentStatus
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.order import OrderCreate
+from app.utils.order_number import create_generator
+
+
+class OrderError(Exception):
+    """Raised when an order references products that cannot be bought"""
+
+    def __init__(self, product_ids: List[int]):
+        super().__init__(f"Products not available: {', '.join(map(str, product_ids))}")
+        self.product_ids = product_ids
+
+
+# Time-ordered, collision-free across hosts with distinct instance ids (enforced at
+# startup) and across their worker processes; no lookup before insert
+order_number_generator = create_generator(settings.ORDER_NUMBER_INSTANCE_ID, lock_dir=settings.ORDER_NUMBER_LOCK_DIR)
+
+
+class OrderService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_user_orders(self, user_id: int, skip: int = 0, limit: int = 20) -> List[Order]:
+        """Get a user's orders with their items, newest first"""
+        return self.db.execute(
+            select(Order)
+            .options(selectinload(Order.order_items))
+            .where(Order.user_id == user_id)
+            .order_by(Order.id.desc())
+            .offset(skip)
+            .limit(limit)
+        ).scalars().all()
+
+    def get_user_order(self, user_id: int, order_id: int) -> Optional[Order]:
+        """Get one of a user's orders with its items"""
+        return self.db.execute(
+            select(Order)
+            .options(selectinload(Order.order_items))
+            .where(Order.id == order_id, Order.user_id == user_id)
+        ).scalars().first()
+
+    def create_order(self, customer: User, order_data: OrderCreate) -> Order:
+        """Place an order: one price lookup, one batched item insert, one counter update"""
+        # Repeated lines for the same product become one item
+        quantities: Dict[int, int] = Counter()
+        for item in order_data.items:
+            quantities[item.product_id] += item.quantity
+
+        products = {
+            row.id: row
+            for row in self.db.execute(
+                select(Product.id, Product.name, Product.price, Product.is_free, Product.download_limit)
+                .where(Product.id.in_(list(quantities)), Product.is_active == True)
+            )
+        }
+        missing = sorted(set(quantities) - set(products))
+        if missing:
+            raise OrderError(missing)
+
+        # Name and price are snapshots, so later catalog edits do not change the order
+        rows = []
+        for product_id, quantity in quantities.items():
+            product = products[product_id]
+            price = Decimal("0.00") if product.is_free else product.price
+            rows.append({
+                "product_id": product_id,
+                "product_name": product.name,
+                "product_price": price,
+                "quantity": quantity,
+                "subtotal": price * quantity,
+                "download_limit": product.download_limit,
+            })
+        total_amount = sum((row["subtotal"] for row in rows), Decimal("0.00"))
+
+        order = Order(
+            order_number=order_number_generator.next(),
+            user_id=customer.id,
+            total_amount=total_amount,
+            customer_email=customer.email,
+            customer_name=customer.full_name or customer.username,
+            payment_method=order_data.payment_method.value,
+            notes=order_data.notes
+        )
+        if total_amount == 0:
+            # Nothing to pay: free downloads are available right away
+            order.status = OrderStatus.COMPLETED
+            order.completed_at = datetime.utcnow()
+        else:
+            order.payment_status = PaymentStatus.PENDING.value
+            order.payments = [Payment(
+                amount=total_amount,
+                method=order_data.payment_method,
+                customer_email=customer.email,
+                billing_name=order.customer_name
+            )]
+        self.db.add(order)
+        self.db.flush()
+
+        # One multi-row INSERT ... RETURNING for all items (a flush would insert
+        # them row by row); the returned rows become the loaded collection
+        for row in rows:
+            row["order_id"] = order.id
+        items = self.db.scalars(insert(OrderItem).returning(OrderItem), rows).all()
+        set_committed_value(order, "order_items", items)
+
+        self._record_purchases(quantities)
+        save(self.db, order)
+        return order
+
+    def _record_purchases(self, quantities: Dict[int, int]) -> None:
+        """Bump purchase counters with one executemany UPDATE"""
+        table = Product.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("product_id"))
+            .values(purchase_count=table.c.purchase_count + bindparam("quantity"))
+        )
+        # Sorted ids keep row locks in a consistent order across concurrent orders
+        self.db.execute(stmt, [
+            {"product_id": product_id, "quantity": quantities[product_id]} for product_id in sorted(quantities)
+        ])
@@ -1,12 +1,90 @@
 from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, func, lambda_stmt, select, update, String
+from sqlalchemy.exc import IntegrityError
 from slugify import slugify
 
 # Import base to ensure all models are loaded
 from app.db.base import Base
+from app.core.unit_of_work import save, save_async
 from app.models.product import Product, ProductCategory
-from app.schemas.product import ProductCreate, ProductUpdate, ProductCategoryCreate, ProductCategoryUpdate
+from app.utils.slug import allocate_slug, allocate_slugs, fit_slug_base, slug_family
+from app.schemas.product import (
+    ProductCreate, ProductUpdate, ProductCategoryCreate, ProductCategoryUpdate, ProductBulkFilter
+)
+
+
+class SlugConflictError(Exception):
+    """Raised when a bulk update would give products slugs that are already taken"""
+
+    def __init__(self, slugs: List[str]):
+        super().__init__(f"Slugs already taken: {', '.join(slugs[:10])}")
+        self.slugs = slugs
+
+
+# Catalog read statements shared by the sync and async services. They are
+# lambda statements: the expression tree is built once per code path and
+# its compiled form is cached, so each call only binds new parameters.
+def categories_statement(skip: int = 0, limit: int = 100):
+    """Select active categories"""
+    return lambda_stmt(
+        lambda: select(ProductCategory).where(ProductCategory.is_active == True).offset(skip).limit(limit)
+    )
+
+
+def products_statement(
+    skip: int = 0,
+    limit: int = 20,
+    category_id: Optional[int] = None,
+    is_featured: Optional[bool] = None,
+    is_free: Optional[bool] = None,
+    search: Optional[str] = None
+):
+    """Select active products with filtering, newest first"""
+    stmt = lambda_stmt(
+        lambda: select(Product).options(joinedload(Product.category)).where(Product.is_active == True)
+    )
+    
+    if category_id:
+        stmt += lambda s: s.where(Product.category_id == category_id)
+    
+    if is_featured is not None:
+        stmt += lambda s: s.where(Product.is_featured == is_featured)
+    
+    if is_free is not None:
+        stmt += lambda s: s.where(Product.is_free == is_free)
+    
+    if search:
+        search_term = f"%{search}%"
+        stmt += lambda s: s.where(
+            or_(
+                Product.name.ilike(search_term),
+                Product.description.ilike(search_term),
+                Product.short_description.ilike(search_term)
+            )
+        )
+    
+    stmt += lambda s: s.order_by(Product.created_at.desc()).offset(skip).limit(limit)
+    return stmt
+
+
+def product_by_id_statement(product_id: int):
+    """Select an active product with its category by ID"""
+    return lambda_stmt(
+        lambda: select(Product).options(joinedload(Product.category)).where(
+            Product.id == product_id, Product.is_active == True
+        )
+    )
+
+
+def product_by_slug_statement(slug: str):
+    """Select an active product with its category by slug"""
+    return lambda_stmt(
+        lambda: select(Product).options(joinedload(Product.category)).where(
+            Product.slug == slug, Product.is_active == True
+        )
+    )
 
 
 class ProductService:
@@ -16,9 +94,7 @@ class ProductService:
     # Category methods
     def get_categories(self, skip: int = 0, limit: int = 100) -> List[ProductCategory]:
         """Get all active categories"""
-        return self.db.query(ProductCategory).filter(
-            ProductCategory.is_active == True
-        ).offset(skip).limit(limit).all()
+        return self.db.execute(categories_statement(skip, limit)).scalars().all()
 
     def get_category_by_id(self, category_id: int) -> Optional[ProductCategory]:
         """Get category by ID"""
@@ -31,6 +107,7 @@ class ProductService:
         """Create a new product category"""
         # Generate slug if not provided
         slug = category_data.slug if category_data.slug else slugify(category_data.name)
+        slug = allocate_slug(self.db, ProductCategory.slug, slug)
         
         category = ProductCategory(
             name=category_data.name,
@@ -39,8 +116,7 @@ class ProductService:
         )
         
         self.db.add(category)
-        self.db.commit()
-        self.db.refresh(category)
+        save(self.db, category)
         return category
 
     # Product methods
@@ -54,53 +130,47 @@ class ProductService:
         search: Optional[str] = None
     ) -> List[Product]:
         """Get products with filtering"""
-        query = self.db.query(Product).filter(Product.is_active == True)
-        
-        if category_id:
-            query = query.filter(Product.category_id == category_id)
-        
-        if is_featured is not None:
-            query = query.filter(Product.is_featured == is_featured)
-        
-        if is_free is not None:
-            query = query.filter(Product.is_free == is_free)
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Product.name.ilike(search_term),
-                    Product.description.ilike(search_term),
-                    Product.short_description.ilike(search_term)
-                )
-            )
-        
-        return query.order_by(Product.created_at.desc()).offset(skip).limit(limit).all()
+        stmt = products_statement(skip, limit, category_id, is_featured, is_free, search)
+        return self.db.execute(stmt).scalars().all()
 
     def get_featured_products(self, limit: int = 10) -> List[Product]:
         """Get featured products"""
-        return self.db.query(Product).filter(
-            and_(Product.is_active == True, Product.is_featured == True)
-        ).order_by(Product.created_at.desc()).limit(limit).all()
+        return self.get_products(limit=limit, is_featured=True)
 
     def get_product_by_id(self, product_id: int) -> Optional[Product]:
         """Get product by ID"""
-        return self.db.query(Product).filter(
-            and_(Product.id == product_id, Product.is_active == True)
-        ).first()
+        return self.db.execute(product_by_id_statement(product_id)).scalars().first()
 
     def get_product_by_slug(self, slug: str) -> Optional[Product]:
         """Get product by slug"""
-        return self.db.query(Product).filter(
-            and_(Product.slug == slug, Product.is_active == True)
-        ).first()
+        return self.db.execute(product_by_slug_statement(slug)).scalars().first()
 
     def create_product(self, product_data: ProductCreate) -> Product:
         """Create a new product"""
         # Generate slug if not provided
         slug = product_data.slug if product_data.slug else slugify(product_data.name)
+        slug = allocate_slug(self.db, Product.slug, slug)
         
-        product = Product(
+        product = self._build_product(product_data, slug)
+        
+        self.db.add(product)
+        save(self.db, product)
+        return product
+
+    def create_products(self, products_data: List[ProductCreate]) -> int:
+        """Create many products in one transaction"""
+        candidates = [data.slug if data.slug else slugify(data.name) for data in products_data]
+        slugs = allocate_slugs(self.db, Product.slug, candidates)
+        
+        self.db.add_all([
+            self._build_product(data, slug) for data, slug in zip(products_data, slugs)
+        ])
+        save(self.db)
+        return len(slugs)
+
+    def _build_product(self, product_data: ProductCreate, slug: str) -> Product:
+        """Build a product instance from create data"""
+        return Product(
             name=product_data.name,
             description=product_data.description,
             short_description=product_data.short_description,
@@ -110,11 +180,6 @@ class ProductService:
             is_free=product_data.is_free,
             category_id=product_data.category_id
         )
-        
-        self.db.add(product)
-        self.db.commit()
-        self.db.refresh(product)
-        return product
 
     def update_product(self, product_id: int, product_data: ProductUpdate) -> Optional[Product]:
         """Update a product"""
@@ -124,15 +189,15 @@ class ProductService:
 
         update_data = product_data.model_dump(exclude_unset=True)
         
-        # Update slug if name is changed
-        if 'name' in update_data and not update_data.get('slug'):
-            update_data['slug'] = slugify(update_data['name'])
+        # Update slug if name is changed; the product's own slug does not count as taken
+        if update_data.get('slug') or 'name' in update_data:
+            slug = update_data.get('slug') or slugify(update_data['name'])
+            update_data['slug'] = allocate_slug(self.db, Product.slug, slug, exclude=Product.id == product_id)
 
         for field, value in update_data.items():
             setattr(product, field, value)
 
-        self.db.commit()
-        self.db.refresh(product)
+        save(self.db, product)
         return product
 
     def delete_product(self, product_id: int) -> bool:
@@ -142,9 +207,85 @@ class ProductService:
             return False
 
         product.is_active = False
-        self.db.commit()
+        save(self.db)
         return True
 
+    # Bulk methods
+    def _bulk_filter_clauses(self, product_filter: ProductBulkFilter) -> list:
+        """Build WHERE clauses for a bulk product filter"""
+        clauses = []
+        if product_filter.ids is not None:
+            clauses.append(Product.id.in_(product_filter.ids))
+        if product_filter.category_id is not None:
+            clauses.append(Product.category_id == product_filter.category_id)
+        if product_filter.min_price is not None:
+            clauses.append(Product.price >= product_filter.min_price)
+        if product_filter.max_price is not None:
+            clauses.append(Product.price <= product_filter.max_price)
+        return clauses
+
+    def bulk_update_products(self, product_filter: ProductBulkFilter, product_data: ProductUpdate) -> int:
+        """Apply one patch to every matching product in a single UPDATE"""
+        update_data = product_data.model_dump(exclude_unset=True)
+        if not update_data:
+            return 0
+
+        clauses = self._bulk_filter_clauses(product_filter)
+
+        # Regenerate slugs set-based: suffix the base slug with the row id so
+        # every matched product stays unique without loading it
+        base_slug = update_data.pop('slug', None)
+        if not base_slug and 'name' in update_data:
+            base_slug = slugify(update_data['name'])
+        if base_slug:
+            ids = self.db.execute(select(Product.id).where(*clauses)).scalars().all()
+            if not ids:
+                return 0
+            head = fit_slug_base(Product.slug, base_slug, f"-{max(ids)}")
+            self._check_suffixed_slugs(head, ids)
+            update_data['slug'] = head + '-' + Product.id.cast(String)
+
+        stmt = (
+            update(Product)
+            .where(*clauses)
+            .values(**update_data)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = self.db.execute(stmt)
+            save(self.db)
+        except IntegrityError:
+            if not base_slug:
+                raise
+            # The unique index is authoritative, e.g. a product added since the check
+            self.db.rollback()
+            self._check_suffixed_slugs(head, ids)
+            raise SlugConflictError([f"{head}-*"])
+        return result.rowcount
+
+    def _check_suffixed_slugs(self, head: str, ids: List[int]) -> None:
+        """Raise SlugConflictError if another product holds one of the head-<id> slugs"""
+        wanted = {f"{head}-{product_id}": product_id for product_id in ids}
+        conflicts = sorted(
+            slug
+            for slug, owner in self.db.execute(select(Product.slug, Product.id).where(slug_family(Product.slug, head)))
+            if slug in wanted and wanted[slug] != owner
+        )
+        if conflicts:
+            raise SlugConflictError(conflicts)
+
+    def bulk_delete_products(self, product_filter: ProductBulkFilter) -> int:
+        """Soft delete every matching product in a single UPDATE"""
+        stmt = (
+            update(Product)
+            .where(Product.is_active == True, *self._bulk_filter_clauses(product_filter))
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        result = self.db.execute(stmt)
+        save(self.db)
+        return result.rowcount
+
     def increment_view_count(self, product_id: int) -> bool:
         """Increment product view count"""
         product = self.db.query(Product).filter(Product.id == product_id).first()
@@ -152,7 +293,7 @@ class ProductService:
             return False
 
         product.view_count += 1
-        self.db.commit()
+        save(self.db)
         return True
 
     def increment_purchase_count(self, product_id: int) -> bool:
@@ -162,5 +303,56 @@ class ProductService:
             return False
 
         product.purchase_count += 1
-        self.db.commit()
+        save(self.db)
         return True
+
+
+class AsyncProductService:
+    """Catalog reads on an AsyncSession, so queries do not block the event loop"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_categories(self, skip: int = 0, limit: int = 100) -> List[ProductCategory]:
+        """Get all active categories"""
+        result = await self.db.execute(categories_statement(skip, limit))
+        return result.scalars().all()
+
+    async def get_products(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        is_featured: Optional[bool] = None,
+        is_free: Optional[bool] = None,
+        search: Optional[str] = None
+    ) -> List[Product]:
+        """Get products with filtering"""
+        stmt = products_statement(skip, limit, category_id, is_featured, is_free, search)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def get_featured_products(self, limit: int = 10) -> List[Product]:
+        """Get featured products"""
+        return await self.get_products(limit=limit, is_featured=True)
+
+    async def get_product_by_id(self, product_id: int) -> Optional[Product]:
+        """Get product by ID"""
+        result = await self.db.execute(product_by_id_statement(product_id))
+        return result.scalars().first()
+
+    async def get_product_by_slug(self, slug: str) -> Optional[Product]:
+        """Get product by slug"""
+        result = await self.db.execute(product_by_slug_statement(slug))
+        return result.scalars().first()
+
+    async def increment_view_count(self, product_id: int) -> bool:
+        """Increment product view count"""
+        # Set-based UPDATE; the default session sync also bumps an already loaded product
+        result = await self.db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(view_count=Product.view_count + 1)
+        )
+        await save_async(self.db)
+        return result.rowcount > 0
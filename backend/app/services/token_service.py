@@ -0,0 +1,114 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Set
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.unit_of_work import after_commit, save
+from app.models.token import RevokedToken
+from app.utils.bloom import BloomFilter
+
+
+class TokenRevocationStore:
+    """Revoked token ids: Bloom filter prefilter + in-memory set, backed by revoked_tokens.
+
+    The table is authoritative and only holds revocations for tokens that
+    have not expired yet; each worker keeps a copy in memory, picks up
+    revocations from other workers every TOKEN_REVOCATION_SYNC_SECONDS and
+    rebuilds from the table every TOKEN_REVOCATION_COMPACT_SECONDS.
+
+    Syncs read by revoked_at, going TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS
+    back past the previous sync: ids and timestamps are assigned before
+    commit, so a revocation can become visible after later ones.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = self._new_bloom()
+        self._revoked: Set[str] = set()
+        self._synced_at: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._last_compact = 0.0
+
+    def _new_bloom(self) -> BloomFilter:
+        return BloomFilter(settings.TOKEN_REVOCATION_BLOOM_CAPACITY, settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE)
+
+    def _remember(self, jti: str) -> None:
+        """Add a revoked token id to the in-memory structures"""
+        with self._lock:
+            self._bloom.add(jti)
+            self._revoked.add(jti)
+
+    def _rebuild(self, db: Session, now: datetime) -> None:
+        """Reload the revocations of unexpired tokens and schedule a purge of the rest"""
+        bloom = self._new_bloom()
+        revoked = set()
+        for jti in db.execute(select(RevokedToken.jti).where(RevokedToken.expires_at >= now)).scalars():
+            bloom.add(jti)
+            revoked.add(jti)
+        self._bloom, self._revoked = bloom, revoked
+
+        # Not on the caller's session: this runs on read paths, whose
+        # transaction must neither be committed nor turned into a write
+        bind = db.get_bind(mapper=RevokedToken)
+        after_commit(db, lambda: self._compact(bind, now))
+
+    @staticmethod
+    def _compact(bind, now: datetime) -> None:
+        """Purge revocations of expired tokens in a session of their own"""
+        with Session(bind=bind) as compact_db:
+            compact_db.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+            compact_db.commit()
+
+    def sync(self, db: Session) -> None:
+        """Pick up revocations from other workers, rebuilding when due"""
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._last_sync < settings.TOKEN_REVOCATION_SYNC_SECONDS:
+            return
+
+        with self._lock:
+            if self._synced_at is not None and now - self._last_sync < settings.TOKEN_REVOCATION_SYNC_SECONDS:
+                return
+            synced_at = datetime.utcnow()
+            if self._synced_at is None or now - self._last_compact >= settings.TOKEN_REVOCATION_COMPACT_SECONDS:
+                self._rebuild(db, synced_at)
+                self._last_compact = now
+            else:
+                since = self._synced_at - timedelta(seconds=settings.TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS)
+                for jti in db.execute(select(RevokedToken.jti).where(RevokedToken.revoked_at >= since)).scalars():
+                    self._bloom.add(jti)
+                    self._revoked.add(jti)
+            self._synced_at = synced_at
+            self._last_sync = now
+
+    def is_revoked(self, db: Session, jti: Optional[str]) -> bool:
+        """Check whether a token id was revoked"""
+        if not jti:
+            return False
+        self.sync(db)
+        # Most tokens were never revoked and miss the Bloom filter without touching the set
+        return jti in self._bloom and jti in self._revoked
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime) -> bool:
+        """Revoke a token id; returns False if it was already revoked"""
+        if jti in self._bloom and jti in self._revoked:
+            return False
+
+        # The unique index on jti makes this the authoritative check across workers
+        db.add(RevokedToken(jti=jti, expires_at=expires_at))
+        try:
+            # Commit now: a revocation must not depend on the rest of the request succeeding
+            save(db, immediate=True)
+        except IntegrityError:
+            db.rollback()
+            self._remember(jti)
+            return False
+
+        self._remember(jti)
+        return True
+
+
+token_revocation_store = TokenRevocationStore()
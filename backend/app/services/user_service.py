@@ -1,11 +1,70 @@
-from typing import Optional
+from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
 
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.schemas.user import UserCreate, UserUpdate, UserInDB
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import get_password_hash_async, verify_and_update_password_async
+from app.core.unit_of_work import after_commit, release_connection, release_connection_async, save, save_async
+from app.services.api_key_service import api_key_cache
+
+# Detached snapshots of recently authenticated users, keyed by user id
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# Current token_version per user id, for authorization straight from token claims
+token_version_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+class UserConflictError(Exception):
+    """Raised when an email or username is already taken"""
+
+    def __init__(self, fields: List[str]):
+        super().__init__(f"Already taken: {', '.join(fields)}")
+        self.fields = fields
+
+
+def _last_login_is_recent(user: User, now: datetime) -> bool:
+    """Whether last_login is newer than the configured write interval"""
+    if user.last_login is None:
+        return False
+    interval = timedelta(minutes=settings.LAST_LOGIN_UPDATE_INTERVAL_MINUTES)
+    return now - user.last_login.replace(tzinfo=None) < interval
+
+
+def _conflicts_statement(email: Optional[str], username: Optional[str], exclude_user_id: Optional[int]):
+    """Select stored emails/usernames that collide with the given ones (None if nothing to check)"""
+    clauses = []
+    if email:
+        clauses.append(User.email == email)
+    if username:
+        clauses.append(User.username == username)
+    if not clauses:
+        return None
+
+    stmt = select(User.email, User.username).where(or_(*clauses))
+    if exclude_user_id is not None:
+        stmt = stmt.where(User.id != exclude_user_id)
+    return stmt
+
+
+def _conflicting_fields(rows, email: Optional[str], username: Optional[str]) -> List[str]:
+    """Which of email/username appear in the colliding rows"""
+    conflicts = []
+    if email and any(row.email == email for row in rows):
+        conflicts.append("email")
+    if username and any(row.username == username for row in rows):
+        conflicts.append("username")
+    return conflicts
+
+
+def _login_statement(email_or_username: str):
+    """Select a user by email or username"""
+    return select(User).where(or_(User.email == email_or_username, User.username == email_or_username))
 
 
 class UserService:
@@ -13,8 +72,42 @@ class UserService:
         self.db = db
 
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        """Get user by ID"""
-        return self.db.query(User).filter(User.id == user_id).first()
+        """Get user by ID (identity map first, then a cached primary-key lookup)"""
+        return self.db.get(User, user_id)
+
+    def get_cached_user(self, user_id: int) -> Optional[UserInDB]:
+        """Get a detached user snapshot by ID, served from the user cache when possible"""
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        user = self.get_user_by_id(user_id)
+        if user is None:
+            return None
+        snapshot = UserInDB.model_validate(user)
+        user_cache.set(user_id, snapshot)
+        return snapshot
+
+    def get_token_version(self, user_id: int) -> Optional[int]:
+        """Get a user's current token version without loading the whole row"""
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot.token_version
+
+        version = token_version_cache.get(user_id)
+        if version is None:
+            version = self.db.query(User.token_version).filter(User.id == user_id).scalar()
+            if version is None:
+                return None
+            token_version_cache.set(user_id, version)
+        return version
+
+    def _invalidate(self, user_id: int) -> None:
+        """Drop cached state for a user, including snapshots of its API keys"""
+        user_cache.delete(user_id)
+        token_version_cache.delete(user_id)
+        # Keys are cached by hash, not owner; account changes are rare enough to drop them all
+        api_key_cache.clear()
 
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
@@ -24,9 +117,33 @@ class UserService:
         """Get user by username"""
         return self.db.query(User).filter(User.username == username).first()
 
-    def create_user(self, user_data: UserCreate) -> User:
+    def find_conflicts(
+        self,
+        email: Optional[str] = None,
+        username: Optional[str] = None,
+        exclude_user_id: Optional[int] = None
+    ) -> List[str]:
+        """Return which of email/username are already taken, in a single query"""
+        stmt = _conflicts_statement(email, username, exclude_user_id)
+        if stmt is None:
+            return []
+        return _conflicting_fields(self.db.execute(stmt).all(), email, username)
+
+    def _save_or_conflict(self, user: User, email: Optional[str], username: Optional[str], exclude_user_id: Optional[int] = None) -> None:
+        """Save, turning a unique index violation into UserConflictError"""
+        try:
+            save(self.db, user)
+        except IntegrityError:
+            # The unique indexes are authoritative; look up which field lost the race
+            self.db.rollback()
+            conflicts = self.find_conflicts(email, username, exclude_user_id)
+            raise UserConflictError(conflicts or ["email", "username"])
+
+    async def create_user(self, user_data: UserCreate) -> User:
         """Create a new user"""
-        hashed_password = get_password_hash(user_data.password)
+        # End any read transaction first so the pooled connection is not held while bcrypt runs
+        release_connection(self.db)
+        hashed_password = await get_password_hash_async(user_data.password)
         
         db_user = User(
             email=user_data.email,
@@ -38,8 +155,7 @@ class UserService:
         )
         
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        self._save_or_conflict(db_user, user_data.email, user_data.username)
         return db_user
 
     def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
@@ -49,41 +165,63 @@ class UserService:
             return None
 
         update_data = user_data.model_dump(exclude_unset=True)
+        if 'is_active' in update_data and update_data['is_active'] != user.is_active:
+            user.token_version += 1
         for field, value in update_data.items():
             setattr(user, field, value)
 
-        self.db.commit()
-        self.db.refresh(user)
+        self._save_or_conflict(user, update_data.get('email'), update_data.get('username'), user_id)
+        after_commit(self.db, lambda: self._invalidate(user_id))
         return user
 
-    def update_password(self, user_id: int, new_password: str) -> bool:
+    async def update_password(self, user_id: int, new_password: str) -> bool:
         """Update user password"""
+        # Hash before loading the user so no connection is held while bcrypt runs
+        hashed_password = await get_password_hash_async(new_password)
         user = self.get_user_by_id(user_id)
         if not user:
             return False
 
-        user.hashed_password = get_password_hash(new_password)
-        self.db.commit()
+        user.hashed_password = hashed_password
+        save(self.db)
+        after_commit(self.db, lambda: user_cache.delete(user_id))
         return True
 
-    def authenticate_user(self, email_or_username: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, email_or_username: str, password: str) -> Optional[User]:
         """Authenticate user with email/username and password"""
-        user = self.db.query(User).filter(
-            or_(User.email == email_or_username, User.username == email_or_username)
-        ).first()
+        user = self.db.execute(_login_statement(email_or_username)).scalars().first()
+        if not user:
+            return None
 
-        if not user or not verify_password(password, user.hashed_password):
+        # Detach the user and end the read transaction so the pooled
+        # connection is free while bcrypt runs in the hash pool
+        self.db.expunge(user)
+        release_connection(self.db)
+        valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not valid:
             return None
+
+        self.db.add(user)
+        if new_hash:
+            # Stored hash uses an outdated scheme or cost; upgrade it transparently
+            user_id = user.id
+            user.hashed_password = new_hash
+            save(self.db)
+            after_commit(self.db, lambda: user_cache.delete(user_id))
         return user
 
-    def update_last_login(self, user_id: int) -> bool:
-        """Update user's last login timestamp"""
-        user = self.get_user_by_id(user_id)
-        if not user:
+    def update_last_login(self, user: User) -> bool:
+        """Update user's last login timestamp (skipped if recently updated)"""
+        now = datetime.utcnow()
+        if _last_login_is_recent(user, now):
             return False
 
-        user.last_login = datetime.utcnow()
-        self.db.commit()
+        # The user row was just loaded by authenticate_user, so this is a
+        # single UPDATE without re-selecting it
+        user_id = user.id
+        user.last_login = now
+        save(self.db)
+        after_commit(self.db, lambda: user_cache.delete(user_id))
         return True
 
     def deactivate_user(self, user_id: int) -> bool:
@@ -93,7 +231,9 @@ class UserService:
             return False
 
         user.is_active = False
-        self.db.commit()
+        user.token_version += 1
+        save(self.db)
+        after_commit(self.db, lambda: self._invalidate(user_id))
         return True
 
     def activate_user(self, user_id: int) -> bool:
@@ -103,5 +243,107 @@ class UserService:
             return False
 
         user.is_active = True
-        self.db.commit()
+        user.token_version += 1
+        save(self.db)
+        after_commit(self.db, lambda: self._invalidate(user_id))
+        return True
+
+    def set_superuser(self, user_id: int, is_superuser: bool) -> bool:
+        """Grant or revoke admin rights, invalidating outstanding tokens"""
+        user = self.get_user_by_id(user_id)
+        if not user:
+            return False
+
+        user.is_superuser = is_superuser
+        user.token_version += 1
+        save(self.db)
+        after_commit(self.db, lambda: self._invalidate(user_id))
+        return True
+
+
+class AsyncUserService:
+    """User reads and login on an AsyncSession; shares the caches of UserService"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        return await self.db.get(User, user_id)
+
+    async def get_cached_user(self, user_id: int) -> Optional[UserInDB]:
+        """Get a detached user snapshot by ID, served from the user cache when possible"""
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        user = await self.get_user_by_id(user_id)
+        if user is None:
+            return None
+        snapshot = UserInDB.model_validate(user)
+        user_cache.set(user_id, snapshot)
+        return snapshot
+
+    async def get_token_version(self, user_id: int) -> Optional[int]:
+        """Get a user's current token version without loading the whole row"""
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot.token_version
+
+        version = token_version_cache.get(user_id)
+        if version is None:
+            result = await self.db.execute(select(User.token_version).where(User.id == user_id))
+            version = result.scalar()
+            if version is None:
+                return None
+            token_version_cache.set(user_id, version)
+        return version
+
+    async def find_conflicts(
+        self,
+        email: Optional[str] = None,
+        username: Optional[str] = None,
+        exclude_user_id: Optional[int] = None
+    ) -> List[str]:
+        """Return which of email/username are already taken, in a single query"""
+        stmt = _conflicts_statement(email, username, exclude_user_id)
+        if stmt is None:
+            return []
+        result = await self.db.execute(stmt)
+        return _conflicting_fields(result.all(), email, username)
+
+    async def authenticate_user(self, email_or_username: str, password: str) -> Optional[User]:
+        """Authenticate user with email/username and password"""
+        result = await self.db.execute(_login_statement(email_or_username))
+        user = result.scalars().first()
+        if not user:
+            return None
+
+        # Detach the user and end the read transaction so the pooled
+        # connection is free while bcrypt runs in the hash pool
+        self.db.expunge(user)
+        await release_connection_async(self.db)
+        valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not valid:
+            return None
+
+        self.db.add(user)
+        if new_hash:
+            # Stored hash uses an outdated scheme or cost; upgrade it transparently
+            user_id = user.id
+            user.hashed_password = new_hash
+            await save_async(self.db)
+            after_commit(self.db, lambda: user_cache.delete(user_id))
+        return user
+
+    async def update_last_login(self, user: User) -> bool:
+        """Update user's last login timestamp (skipped if recently updated)"""
+        now = datetime.utcnow()
+        if _last_login_is_recent(user, now):
+            return False
+
+        user_id = user.id
+        user.last_login = now
+        await save_async(self.db)
+        after_commit(self.db, lambda: user_cache.delete(user_id))
         return True
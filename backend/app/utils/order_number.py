@@ -0,0 +1,155 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import zlib
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock
+    fcntl = None
+
+# Crockford base32: no I, L, O or U, so numbers survive being read aloud or
+# retyped, and the alphabet is in ASCII order, so text order is numeric order
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+
+# Snowflake layout: 41 bits of milliseconds since EPOCH_MS (about 69 years),
+# 10 bits of worker id, 12 bits of per-millisecond sequence
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+TIMESTAMP_BITS = 41
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+# A worker id is an instance id (one per host or container, from settings)
+# followed by a process slot leased on that host at startup
+PROCESS_BITS = 5
+MAX_INSTANCE_ID = (1 << (WORKER_BITS - PROCESS_BITS)) - 1
+MAX_PROCESS_SLOT = (1 << PROCESS_BITS) - 1
+_MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+ENCODED_LENGTH = 13  # ceil(64 / 5)
+
+
+def encode(value: int) -> str:
+    """Fixed-width base32 text of a 64-bit id"""
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def decode(text: str) -> int:
+    """Inverse of encode"""
+    value = 0
+    for char in text:
+        value = value * 32 + _DECODE[char]
+    return value
+
+
+def split_id(value: int) -> Tuple[int, int, int]:
+    """(unix milliseconds, worker id, sequence) of an id"""
+    sequence = value & _MAX_SEQUENCE
+    worker_id = (value >> SEQUENCE_BITS) & MAX_WORKER_ID
+    timestamp = (value >> (SEQUENCE_BITS + WORKER_BITS)) + EPOCH_MS
+    return timestamp, worker_id, sequence
+
+
+def derive_instance_id() -> int:
+    """Instance id from the host name (development only: hosts can share one)"""
+    return zlib.crc32(socket.gethostname().encode()) & MAX_INSTANCE_ID
+
+
+# Lock files of the slots this process leased, open until it exits
+_leases: List = []
+
+
+def lease_process_slot(instance_id: int, lock_dir: Optional[str] = None) -> int:
+    """Lock the lowest process slot of an instance that no live process on this host holds.
+
+    Slots are flock()ed files, so a crashed process frees its slot, and a
+    forked child (which shares its parent's locks) leases a slot of its own.
+    Without flock the slot falls back to the pid.
+    """
+    if fcntl is None:
+        return os.getpid() & MAX_PROCESS_SLOT
+    lock_dir = lock_dir or tempfile.gettempdir()
+    for slot in range(MAX_PROCESS_SLOT + 1):
+        lock_file = open(os.path.join(lock_dir, f"order-number-{instance_id}-{slot}.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        _leases.append(lock_file)
+        return slot
+    raise RuntimeError(f"All {MAX_PROCESS_SLOT + 1} order number slots of instance {instance_id} are in use")
+
+
+def lease_worker_id(instance_id: int, lock_dir: Optional[str] = None) -> int:
+    """Worker id of this process: the instance id and a leased process slot"""
+    if not 0 <= instance_id <= MAX_INSTANCE_ID:
+        raise ValueError(f"instance_id must be between 0 and {MAX_INSTANCE_ID}")
+    return (instance_id << PROCESS_BITS) | lease_process_slot(instance_id, lock_dir)
+
+
+class OrderNumberGenerator:
+    """Coordination-free, time-ordered order numbers (snowflake ids in Crockford base32).
+
+    Numbers from one generator strictly increase, and generators with
+    different worker ids never collide, so no database lookup is needed.
+    create_generator hands each process its own worker id.
+    When the sequence runs out within a millisecond, or the clock steps
+    back, the generator keeps counting from its last timestamp instead of
+    sleeping.
+    """
+
+    def __init__(self, worker_id: int, prefix: str = "ORD-", clock: Callable[[], float] = time.time):
+        self.prefix = prefix
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset(worker_id)
+
+    def reset(self, worker_id: int) -> None:
+        """Switch worker id (e.g. in a forked child) and restart the sequence"""
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        with self._lock:
+            self.worker_id = worker_id
+            self._last_timestamp = -1
+            self._sequence = 0
+
+    def next_id(self) -> int:
+        """Next 64-bit id"""
+        now = int(self._clock() * 1000) - EPOCH_MS
+        with self._lock:
+            if now > self._last_timestamp:
+                self._last_timestamp, self._sequence = now, 0
+            elif self._sequence < _MAX_SEQUENCE:
+                self._sequence += 1
+            else:
+                self._last_timestamp, self._sequence = self._last_timestamp + 1, 0
+            timestamp, worker_id, sequence = self._last_timestamp, self.worker_id, self._sequence
+        return (timestamp << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | sequence
+
+    def next(self) -> str:
+        """Next order number, e.g. ORD-0A94Q6R3BQ800"""
+        return self.prefix + encode(self.next_id())
+
+
+def create_generator(
+    instance_id: Optional[int] = None, prefix: str = "ORD-", lock_dir: Optional[str] = None
+) -> OrderNumberGenerator:
+    """Generator for this process, with a worker id leased under instance_id (again after fork).
+
+    Every process of an instance, e.g. each uvicorn or gunicorn worker
+    started with the same settings, gets its own worker id.
+    """
+    if instance_id is None:
+        instance_id = derive_instance_id()
+    generator = OrderNumberGenerator(lease_worker_id(instance_id, lock_dir), prefix)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=lambda: generator.reset(lease_worker_id(instance_id, lock_dir)))
+    return generator
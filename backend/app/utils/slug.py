@@ -0,0 +1,80 @@
+from typing import List, Set
+from sqlalchemy import and_, not_, or_, select
+from sqlalchemy.orm import Session
+
+
+def _slug_length(column) -> int:
+    """Get the max length of a slug column (0 if unbounded)"""
+    return getattr(column.type, "length", None) or 0
+
+
+def slug_family(column, base: str):
+    """Match base and base-*; a range rather than LIKE, so the slug index serves it ('.' sorts right after '-')"""
+    return or_(column == base, and_(column >= f"{base}-", column < f"{base}."))
+
+
+def fit_slug_base(column, base: str, longest_suffix: str) -> str:
+    """Shorten base so base + suffix fits the column"""
+    max_length = _slug_length(column)
+    return base[:max_length - len(longest_suffix)] if max_length else base
+
+
+def _stored_slugs(db: Session, column, condition, exclude) -> Set[str]:
+    """Fetch stored slugs matching condition, skipping rows matched by exclude"""
+    stmt = select(column).where(condition)
+    if exclude is not None:
+        stmt = stmt.where(not_(exclude))
+    return set(db.execute(stmt).scalars())
+
+
+def _existing_slugs(db: Session, column, bases: Set[str], exclude=None) -> Set[str]:
+    """Fetch every stored slug that could collide with the given bases in one query"""
+    if not bases:
+        return set()
+    clauses = [slug_family(column, base) for base in bases]
+    return _stored_slugs(db, column, or_(*clauses), exclude)
+
+
+def _next_free_slug(base: str, taken: Set[str], max_length: int) -> str:
+    """Pick the first free slug among base, base-2, base-3, ..."""
+    slug = base[:max_length] if max_length else base
+    suffix = 2
+    while slug in taken:
+        tail = f"-{suffix}"
+        head = base[:max_length - len(tail)] if max_length else base
+        slug = f"{head}{tail}"
+        suffix += 1
+    taken.add(slug)
+    return slug
+
+
+def allocate_slugs(db: Session, column, candidates: List[str], exclude=None) -> List[str]:
+    """Allocate a unique slug for every candidate, in order.
+
+    Existing slugs are loaded with a single query and collisions (with the
+    table or within the batch) get deterministic ``-2``, ``-3``... suffixes.
+    Rows matched by the optional ``exclude`` clause do not count as taken,
+    so a row being renamed can keep its own slug.
+    """
+    max_length = _slug_length(column)
+    bases = [candidate[:max_length] if max_length else candidate for candidate in candidates]
+    taken = _existing_slugs(db, column, set(bases), exclude)
+    checked: Set[str] = set()
+    while True:
+        reserved = set(taken)
+        slugs = [_next_free_slug(base, reserved, max_length) for base in bases]
+        # A suffix on a full-length base cuts into the base, so the range
+        # query did not cover it: check those slugs directly
+        unchecked = {slug for slug, base in zip(slugs, bases) if not slug.startswith(base)} - checked
+        if not unchecked:
+            return slugs
+        checked |= unchecked
+        found = _stored_slugs(db, column, column.in_(unchecked), exclude)
+        if not found:
+            return slugs
+        taken |= found
+
+
+def allocate_slug(db: Session, column, candidate: str, exclude=None) -> str:
+    """Allocate a single unique slug"""
+    return allocate_slugs(db, column, [candidate], exclude)[0]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent catalog throughput, blocking vs threadpool vs async database path
+
+Serves the product list three times from a throwaway app: through the sync
+ProductService/get_db in an async endpoint (queries block the event loop),
+in a plain def endpoint (FastAPI runs it in the threadpool, as the public
+catalog reads do) and through AsyncProductService/get_async_db. Requests are
+issued concurrently in-process against the configured database (create the
+sample data first), while a probe measures how long a trivial route waits
+for the event loop.
+
+CONCURRENCY stays within the sync pool (pool_size + max_overflow): past that
+the blocking path wedges the loop while waiting for a pooled connection.
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.core.database import get_db, get_async_db, async_engine
+from app.services.product_service import ProductService, AsyncProductService
+
+REQUESTS = 1000
+CONCURRENCY = 10
+PROBE_INTERVAL = 0.005
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/ping")
+async def ping():
+    """Event loop responsiveness probe"""
+    return "pong"
+
+
+@bench_app.get("/sync")
+async def sync_products(db: Session = Depends(get_db)):
+    """Product list on the blocking session"""
+    return len(ProductService(db).get_products(limit=20))
+
+
+@bench_app.get("/threaded")
+def threaded_products(db: Session = Depends(get_db)):
+    """Product list on the sync session, in the threadpool"""
+    return len(ProductService(db).get_products(limit=20))
+
+
+@bench_app.get("/async")
+async def async_products(db: AsyncSession = Depends(get_async_db)):
+    """Product list on the async session"""
+    return len(await AsyncProductService(db).get_products(limit=20))
+
+
+def p95(latencies: list) -> float:
+    """95th percentile in milliseconds"""
+    latencies.sort()
+    return latencies[int(len(latencies) * 0.95)] * 1000
+
+
+async def run(client: httpx.AsyncClient, url: str) -> tuple:
+    """Return (requests per second, p95 latency in ms, probe p95 latency in ms)"""
+    latencies = []
+    probes = []
+    done = asyncio.Event()
+    queue = asyncio.Queue()
+    for _ in range(REQUESTS):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/ping")
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    return REQUESTS / elapsed, p95(latencies), p95(probes)
+
+
+async def main():
+    """Compare the blocking, threadpool and async product list under concurrency"""
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/async")
+        if response.json() == 0:
+            print("❌ Run scripts/create_sample_data.py first")
+            return
+
+        print(f"{REQUESTS} requests, {CONCURRENCY} concurrent")
+        for name in ("sync", "threaded", "async"):
+            await client.get(f"/{name}")  # warm up connections
+            rps, latency, probe = await run(client, f"/{name}")
+            print(f"{name:<8} {rps:8.1f} req/s  p95 {latency:7.1f} ms  /ping p95 {probe:7.1f} ms")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: product detail throughput and SQL statements per request
+
+Runs in-process against the configured database (create the sample data
+first) and compares anonymous requests with requests carrying a bearer
+token. Public catalog reads should issue no auth queries either way.
+"""
+
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.core.config import settings
+from app.core.database import async_engine, SessionLocal
+from app.core.security import create_access_token
+from app.models.product import Product
+from app.models.user import User
+
+REQUESTS = 500
+
+
+def run(client: TestClient, url: str, headers: dict, statements: list) -> tuple:
+    """Return (requests per second, SQL statements per request)"""
+    statements.clear()
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = client.get(url, headers=headers)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return REQUESTS / elapsed, len(statements) / REQUESTS
+
+
+def main():
+    """Compare anonymous and authenticated product detail requests"""
+    settings.RATE_LIMIT_ENABLED = False
+
+    db = SessionLocal()
+    product = db.query(Product).filter(Product.is_active == True).first()
+    user = db.query(User).first()
+    db.close()
+    if product is None or user is None:
+        print("❌ Run scripts/create_sample_data.py first")
+        return
+
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    token = create_access_token(data={"sub": str(user.id)})
+    client = TestClient(app)
+    url = f"{settings.API_V1_STR}/products/{product.id}"
+
+    for name, headers in [("anonymous", {}), ("bearer token", {"Authorization": f"Bearer {token}"})]:
+        rps, per_request = run(client, url, headers, statements)
+        print(f"{name:<14} {rps:8.1f} req/s  {per_request:.1f} SQL statements/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent SQLite reads/writes with and without the tuning profile
+
+Builds a scratch database per profile (the configured DATABASE_URL is not
+touched), seeds it with products, then runs reader threads listing products
+alongside writer threads committing view count updates. Compares SQLite's
+defaults (rollback journal, synchronous=FULL) with the PRAGMAs from Settings.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.core.database import set_sqlite_pragmas, sqlite_pragmas
+from app.models.product import Product
+from app.services.product_service import ProductService
+
+PRODUCTS = 500
+READERS = 8
+WRITERS = 2
+DURATION = 5.0
+
+
+def seed(SessionFactory):
+    """Insert the sample products"""
+    db = SessionFactory()
+    db.add_all(
+        Product(name=f"Product {i}", slug=f"product-{i}", description="Benchmark product", price=Decimal("9.99"))
+        for i in range(PRODUCTS)
+    )
+    db.commit()
+    db.close()
+
+
+def run(tuned: bool) -> dict:
+    """Return reads/s, writes/s and lock errors for one profile"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False},
+            pool_size=READERS + WRITERS
+        )
+        if tuned:
+            event.listen(engine, "connect", set_sqlite_pragmas)
+        Base.metadata.create_all(bind=engine)
+        SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        seed(SessionFactory)
+
+        counts = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        stop = time.perf_counter() + DURATION
+
+        def count(key):
+            with lock:
+                counts[key] += 1
+
+        def reader():
+            db = SessionFactory()
+            service = ProductService(db)
+            while time.perf_counter() < stop:
+                try:
+                    service.get_products(limit=20)
+                    db.rollback()
+                    count("reads")
+                except OperationalError:
+                    db.rollback()
+                    count("locked")
+            db.close()
+
+        def writer(offset):
+            db = SessionFactory()
+            product_id = offset
+            while time.perf_counter() < stop:
+                try:
+                    db.execute(
+                        update(Product)
+                        .where(Product.id == product_id % PRODUCTS + 1)
+                        .values(view_count=Product.view_count + 1)
+                    )
+                    db.commit()
+                    count("writes")
+                except OperationalError:
+                    db.rollback()
+                    count("locked")
+                product_id += WRITERS
+            db.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(READERS)]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {
+        "reads": counts["reads"] / DURATION,
+        "writes": counts["writes"] / DURATION,
+        "locked": counts["locked"],
+    }
+
+
+def main():
+    """Compare SQLite defaults with the configured tuning profile"""
+    print(f"{READERS} readers, {WRITERS} writers, {DURATION:.0f}s per profile")
+    print(f"tuned profile: {sqlite_pragmas()}")
+    for name, tuned in [("default", False), ("tuned", True)]:
+        result = run(tuned)
+        print(
+            f"{name:<8} {result['reads']:9.1f} reads/s  {result['writes']:8.1f} writes/s  "
+            f"{result['locked']} lock errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call overhead of the hot catalog/user queries
+
+Seeds an in-memory SQLite database and times the ProductService/UserService
+hot paths against the legacy ``db.query(...).filter(...)`` forms they
+replaced. Both return the same rows, so the difference is statement
+construction and compiled-cache lookup.
+"""
+
+import sys
+import os
+import time
+from decimal import Decimal
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import and_, create_engine
+from sqlalchemy.orm import joinedload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.models.product import Product, ProductCategory
+from app.models.user import User
+from app.services.product_service import ProductService
+from app.services.user_service import UserService
+
+CALLS = 2000
+REPEATS = 5
+
+
+def seed(db):
+    """Insert a category, products and a user"""
+    category = ProductCategory(name="Bench", slug="bench")
+    db.add(category)
+    db.flush()
+    db.add_all(
+        Product(name=f"Product {i}", slug=f"product-{i}", price=Decimal("9.99"), category_id=category.id)
+        for i in range(50)
+    )
+    db.add(User(email="bench@example.com", username="bench", hashed_password="x"))
+    db.commit()
+
+
+def legacy_get_products(db, limit=20, category_id=None):
+    query = db.query(Product).options(joinedload(Product.category)).filter(Product.is_active == True)
+    if category_id:
+        query = query.filter(Product.category_id == category_id)
+    return query.order_by(Product.created_at.desc()).offset(0).limit(limit).all()
+
+
+def legacy_get_product_by_id(db, product_id):
+    return db.query(Product).options(joinedload(Product.category)).filter(and_(Product.id == product_id, Product.is_active == True)).first()
+
+
+def legacy_get_product_by_slug(db, slug):
+    return db.query(Product).options(joinedload(Product.category)).filter(and_(Product.slug == slug, Product.is_active == True)).first()
+
+
+def legacy_get_user_by_id(db, user_id):
+    return db.query(User).filter(User.id == user_id).first()
+
+
+def per_call(db, func) -> float:
+    """Best-of-REPEATS microseconds per call, with a fresh identity map for every call"""
+    func()
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            func()
+            db.expunge_all()
+        best = min(best, time.perf_counter() - start)
+    return best / CALLS * 1_000_000
+
+
+def main():
+    """Compare legacy query construction with the cached statements"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db)
+
+    products = ProductService(db)
+    users = UserService(db)
+    cases = [
+        ("get_products", lambda: legacy_get_products(db, category_id=1), lambda: products.get_products(category_id=1)),
+        ("get_product_by_id", lambda: legacy_get_product_by_id(db, 7), lambda: products.get_product_by_id(7)),
+        ("get_product_by_slug", lambda: legacy_get_product_by_slug(db, "product-7"), lambda: products.get_product_by_slug("product-7")),
+        ("get_user_by_id", lambda: legacy_get_user_by_id(db, 1), lambda: users.get_user_by_id(1)),
+    ]
+
+    print(f"best of {REPEATS} x {CALLS} calls, in-memory SQLite")
+    for name, before, after in cases:
+        legacy = per_call(db, before)
+        cached = per_call(db, after)
+        print(f"{name:<20} legacy {legacy:8.1f} us  cached {cached:8.1f} us  ({(1 - cached / legacy) * 100:+.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
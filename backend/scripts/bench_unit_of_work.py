@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: transactions per request with and without the unit of work
+
+Serves two routes from a throwaway app on a scratch SQLite database (the
+configured DATABASE_URL is not touched): a product view that bumps the view
+count, and a purchase that bumps three purchase counters and the buyer's
+last login through the service methods. Each runs once with every service
+call committing on its own and once with the request-scoped unit of work,
+counting COMMITs and statements on the engine.
+
+With WAL and synchronous=NORMAL a SQLite commit is cheap, so throughput
+moves little; set SQLITE_SYNCHRONOUS=FULL to see the cost of one fsync per
+commit. Against a networked database each saved statement is a round trip.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import time
+from decimal import Decimal
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'bench.db')}"
+os.environ["ENVIRONMENT"] = "benchmark"
+os.environ["SQL_INSTRUMENTATION_ENABLED"] = "false"
+os.environ["LAST_LOGIN_UPDATE_INTERVAL_MINUTES"] = "0"
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.core.config import settings
+from app.core.database import SessionLocal, dispose_engines, engine, get_db
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.models.product import Product
+from app.models.user import User
+from app.services.product_service import ProductService
+from app.services.user_service import UserService
+
+REQUESTS = 2000
+PURCHASED_PRODUCTS = [1, 2, 3]
+
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+
+@router.post("/view/{product_id}")
+async def view(product_id: int, db: Session = Depends(get_db)):
+    """Product detail plus view counter"""
+    product_service = ProductService(db)
+    product = product_service.get_product_by_id(product_id)
+    product_service.increment_view_count(product_id)
+    return product.view_count
+
+
+@router.post("/purchase")
+async def purchase(db: Session = Depends(get_db)):
+    """Purchase counters for several products plus the buyer's last login"""
+    product_service = ProductService(db)
+    for product_id in PURCHASED_PRODUCTS:
+        product_service.increment_purchase_count(product_id)
+    user_service = UserService(db)
+    user_service.update_last_login(user_service.get_user_by_id(1))
+    return "ok"
+
+
+bench_app = FastAPI()
+bench_app.include_router(router)
+
+
+def seed():
+    """Create the schema, a user and a few products"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(email="bench@example.com", username="bench", hashed_password="x"))
+    db.add_all(
+        Product(name=f"Product {i}", slug=f"product-{i}", price=Decimal("9.99"))
+        for i in range(10)
+    )
+    db.commit()
+    db.close()
+
+
+async def run(client: httpx.AsyncClient, url: str, counters: dict) -> tuple:
+    """Return (requests per second, commits per request, statements per request)"""
+    counters.update(commits=0, statements=0)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = await client.post(url)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return REQUESTS / elapsed, counters["commits"] / REQUESTS, counters["statements"] / REQUESTS
+
+
+def count(counters: dict, name: str):
+    """Engine event listener incrementing one counter"""
+    def listener(*args):
+        counters[name] += 1
+    return listener
+
+
+async def main():
+    """Compare per-call commits with one commit per request"""
+    seed()
+    counters = {"commits": 0, "statements": 0}
+    event.listen(engine, "commit", count(counters, "commits"))
+    event.listen(engine, "before_cursor_execute", count(counters, "statements"))
+
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{REQUESTS} sequential requests, SQLite file database, synchronous={settings.SQLITE_SYNCHRONOUS}")
+        for url in ("/view/1", "/purchase"):
+            for enabled in (False, True):
+                settings.UNIT_OF_WORK_ENABLED = enabled
+                await client.post(url)  # warm up
+                rps, commits, statements = await run(client, url, counters)
+                mode = "unit of work" if enabled else "per call"
+                print(f"{url:<10} {mode:<13} {rps:8.1f} req/s  {commits:4.1f} commits  {statements:4.1f} statements per request")
+
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Calibrate password hashing cost for this host
+
+Benchmarks bcrypt (and argon2 when argon2-cffi is installed) and suggests
+the strongest parameters whose hash time fits the target latency budget.
+Put the suggested values in .env; existing hashes are upgraded on the
+next successful login.
+
+Usage: python scripts/calibrate_password_hash.py [--target-ms 250]
+"""
+
+import argparse
+import time
+
+from passlib.context import CryptContext
+from passlib.hash import argon2
+
+SAMPLE_PASSWORD = "calibration-password"
+
+
+def time_hash(context: CryptContext, samples: int) -> float:
+    """Return the median hash time in milliseconds"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> int:
+    """Find the highest bcrypt rounds under the target"""
+    print("bcrypt:")
+    best = 8  # Floor even if the host cannot meet the target
+    for rounds in range(8, 17):
+        elapsed = time_hash(CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds), samples)
+        print(f"  rounds={rounds:<2}  {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = rounds
+    return best
+
+
+def calibrate_argon2(target_ms: float, samples: int, memory_cost: int) -> int:
+    """Find the highest argon2 time cost under the target for a fixed memory cost"""
+    print(f"argon2 (memory_cost={memory_cost} KiB):")
+    best = 1
+    for time_cost in range(1, 11):
+        context = CryptContext(
+            schemes=["argon2"], argon2__time_cost=time_cost, argon2__memory_cost=memory_cost
+        )
+        elapsed = time_hash(context, samples)
+        print(f"  time_cost={time_cost:<2}  {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = time_cost
+    return best
+
+
+def main():
+    """Benchmark hash cost and print suggested settings"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Latency budget per hash")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes per parameter set")
+    parser.add_argument("--argon2-memory-kib", type=int, default=65536)
+    args = parser.parse_args()
+
+    print(f"Target: {args.target_ms:.0f} ms per hash\n")
+    rounds = calibrate_bcrypt(args.target_ms, args.samples)
+
+    suggestions = [f"BCRYPT_ROUNDS={rounds}"]
+    if argon2.has_backend():
+        time_cost = calibrate_argon2(args.target_ms, args.samples, args.argon2_memory_kib)
+        suggestions += [
+            'PASSWORD_HASH_SCHEMES=["argon2", "bcrypt"]',
+            f"ARGON2_TIME_COST={time_cost}",
+            f"ARGON2_MEMORY_COST={args.argon2_memory_kib}",
+        ]
+    else:
+        print("argon2: skipped (pip install argon2-cffi to enable)")
+
+    print("\nSuggested settings:")
+    for line in suggestions:
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Load test: catalog latency while a login storm is running
+
+Start the API first (uvicorn app.main:app --port 8000) and create the
+sample data, then run this script. Catalog latency should stay roughly
+flat while logins run because bcrypt no longer blocks the event loop.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+BASE_URL = os.getenv("BASE_URL", "http://localhost:8000/api/v1")
+LOGIN_USER = os.getenv("LOGIN_USER", "admin@example.com")
+LOGIN_PASSWORD = os.getenv("LOGIN_PASSWORD", "admin123")
+CATALOG_REQUESTS = 200
+LOGIN_CONCURRENCY = 32
+
+
+async def measure_catalog(client: httpx.AsyncClient, count: int) -> list:
+    """Time sequential product list requests, in milliseconds"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get(f"{BASE_URL}/products/")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def login_storm(client: httpx.AsyncClient, stop: asyncio.Event) -> dict:
+    """Keep LOGIN_CONCURRENCY logins in flight until stopped"""
+    results = {"ok": 0, "rejected": 0, "failed": 0}
+
+    async def worker():
+        while not stop.is_set():
+            response = await client.post(
+                f"{BASE_URL}/auth/login",
+                data={"username": LOGIN_USER, "password": LOGIN_PASSWORD},
+            )
+            if response.status_code == 200:
+                results["ok"] += 1
+            elif response.status_code in (429, 503):
+                results["rejected"] += 1
+            else:
+                results["failed"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(LOGIN_CONCURRENCY)))
+    return results
+
+
+def summarize(name: str, latencies: list):
+    """Print latency percentiles"""
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} p50={statistics.median(latencies):7.2f}ms  p95={p95:7.2f}ms  max={latencies[-1]:7.2f}ms")
+
+
+async def main():
+    """Compare catalog latency idle vs. during a login storm"""
+    limits = httpx.Limits(max_connections=LOGIN_CONCURRENCY + 4)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        baseline = await measure_catalog(client, CATALOG_REQUESTS)
+
+        stop = asyncio.Event()
+        storm = asyncio.create_task(login_storm(client, stop))
+        await asyncio.sleep(1)  # let the storm ramp up
+        loaded = await measure_catalog(client, CATALOG_REQUESTS)
+        stop.set()
+        logins = await storm
+
+    summarize("Catalog (idle)", baseline)
+    summarize("Catalog (login storm)", loaded)
+    print(f"Logins: {logins['ok']} ok, {logins['rejected']} rejected, {logins['failed']} failed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
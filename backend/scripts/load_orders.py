@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Load test: order creation throughput on SQLite
+
+Runs the API in-process against a scratch SQLite database (the configured
+DATABASE_URL is not touched), logs in once and keeps CONCURRENCY clients
+placing orders of ITEMS_PER_ORDER products for DURATION seconds. Fails
+(exit code 1) when throughput is below TARGET_ORDERS_PER_SECOND.
+"""
+
+import sys
+import os
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+SCRATCH_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'orders.db')}"
+os.environ["ENVIRONMENT"] = "benchmark"
+os.environ["SQL_INSTRUMENTATION_ENABLED"] = "false"
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.core.database import SessionLocal, dispose_engines, engine
+from app.core.security import get_password_hash
+from app.main import app
+from app.models.product import Product
+from app.models.user import User
+
+PRODUCTS = 200
+ITEMS_PER_ORDER = 3
+CONCURRENCY = 8
+DURATION = 10.0
+TARGET_ORDERS_PER_SECOND = float(os.getenv("TARGET_ORDERS_PER_SECOND", "150"))
+
+
+def seed():
+    """Create the schema, a buyer and the catalog"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(email="buyer@example.com", username="buyer", hashed_password=get_password_hash("buyer123")))
+    db.add_all(
+        Product(name=f"Product {i}", slug=f"product-{i}", price=Decimal("9.99"))
+        for i in range(PRODUCTS)
+    )
+    db.commit()
+    db.close()
+
+
+async def place_orders(client: httpx.AsyncClient, headers: dict, deadline: float, latencies: list, errors: list):
+    """Place random orders until the deadline"""
+    while time.perf_counter() < deadline:
+        items = [
+            {"product_id": product_id}
+            for product_id in random.sample(range(1, PRODUCTS + 1), ITEMS_PER_ORDER)
+        ]
+        start = time.perf_counter()
+        response = await client.post("/api/v1/orders/", json={"items": items}, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def main() -> bool:
+    """Run the load and compare with the target"""
+    seed()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        response = await client.post("/api/v1/auth/login", data={"username": "buyer", "password": "buyer123"})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies, errors = [], []
+        deadline = time.perf_counter() + DURATION
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            place_orders(client, headers, deadline, latencies, errors) for _ in range(CONCURRENCY)
+        ))
+        elapsed = time.perf_counter() - start
+
+    await dispose_engines()
+
+    orders_per_second = (len(latencies) - len(errors)) / elapsed
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"{len(latencies)} orders of {ITEMS_PER_ORDER} items, {CONCURRENCY} concurrent, {elapsed:.1f}s")
+    print(f"{orders_per_second:.1f} orders/s  p50 {statistics.median(latencies) * 1000:.1f} ms  p95 {p95:.1f} ms  errors {len(errors)}")
+
+    passed = not errors and orders_per_second >= TARGET_ORDERS_PER_SECOND
+    print(f"{'✅' if passed else '❌'} target {TARGET_ORDERS_PER_SECOND:.0f} orders/s")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
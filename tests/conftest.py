@@ -0,0 +1,80 @@
+"""
+Shared fixtures: the API on a scratch SQLite database
+
+The ``api`` fixture points the app's session factories at a fresh database
+file and clears the per-worker caches; ``login`` logs a seeded user in.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.api.v1.endpoints import auth as auth_endpoints
+from app.core import database
+from app.core.config import settings
+from app.core.idempotency import idempotency_store
+from app.core.security import get_password_hash, token_cache
+from app.main import app
+from app.models.user import User
+from app.services.api_key_service import api_key_cache
+from app.services.token_service import TokenRevocationStore
+from app.services.user_service import token_version_cache, user_cache
+
+PASSWORD = "secret123"
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """TestClient on a scratch database seeded with an admin and a customer"""
+    url = f"sqlite:///{tmp_path / 'api.db'}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    monkeypatch.setattr(
+        database, "AsyncSessionLocal", async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(auth_endpoints, "token_revocation_store", TokenRevocationStore())
+    for cache in (user_cache, token_version_cache, token_cache, api_key_cache, idempotency_store._cache):
+        cache.clear()
+
+    db = session_factory()
+    db.add_all([
+        User(email="admin@example.com", username="admin", hashed_password=get_password_hash(PASSWORD), is_superuser=True),
+        User(email="customer@example.com", username="customer", hashed_password=get_password_hash(PASSWORD)),
+    ])
+    db.commit()
+    db.close()
+
+    # No lifespan: startup would create the upload folder in the working directory
+    client = TestClient(app)
+    client.session_factory = session_factory
+    yield client
+    engine.dispose()
+
+
+@pytest.fixture
+def login(api):
+    """Log a seeded user in; returns its tokens plus bearer headers"""
+    def log_in(username: str = "admin") -> dict:
+        response = api.post("/api/v1/auth/login", data={"username": username, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        tokens = response.json()
+        tokens["headers"] = {"Authorization": f"Bearer {tokens['access_token']}"}
+        return tokens
+
+    return log_in
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Access token checks
+
+Only access tokens authorize requests: a refresh token sent as a bearer
+token is refused on user, claims-based and admin routes alike. Bumping a
+user's token_version, as revoking admin rights does, refuses every token
+issued before it, including ones whose claims and user are cached.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.services.user_service import UserService
+
+ADMIN_ID = 1
+
+
+@pytest.mark.parametrize("path", ["/api/v1/users/me", "/api/v1/auth/me", "/api/v1/diagnostics/"])
+def test_refresh_token_is_not_a_bearer_token(api, login, path):
+    tokens = login()
+    assert api.get(path, headers=tokens["headers"]).status_code == 200
+    refresh = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    assert api.get(path, headers=refresh).status_code == 401
+
+
+def test_token_version_bump_refuses_outstanding_tokens(api, login):
+    """Revoked admin rights take effect at once, not when the token's claims expire"""
+    headers = login()["headers"]
+    for path in ("/api/v1/users/me", "/api/v1/diagnostics/"):
+        assert api.get(path, headers=headers).status_code == 200  # Caches the user and token version
+
+    db = api.session_factory()
+    assert UserService(db).set_superuser(ADMIN_ID, False)
+    db.close()
+
+    for path in ("/api/v1/users/me", "/api/v1/auth/me", "/api/v1/diagnostics/"):
+        assert api.get(path, headers=headers).status_code == 401
+    # A new token carries the new version and claims
+    headers = login()["headers"]
+    assert api.get("/api/v1/users/me", headers=headers).status_code == 200
+    assert api.get("/api/v1/diagnostics/", headers=headers).status_code == 403
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+API key authorization checks
+
+A key never grants more than its owner currently has: taking admin rights
+away stops catalog writes with the owner's write key, and deactivating the
+owner stops the key altogether. Keys are honoured on catalog routes only.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.services.user_service import UserService
+
+
+def create_key(api, headers, scopes):
+    response = api.post("/api/v1/api-keys/", json={"name": "sync", "scopes": scopes}, headers=headers)
+    assert response.status_code == 200, response.text
+    return {"X-API-Key": response.json()["key"]}
+
+
+def new_product(name):
+    return {"name": name, "slug": name.lower(), "price": "9.99"}
+
+
+def update_owner(api, change):
+    """Apply a UserService change to the admin (id 1) outside any request"""
+    db = api.session_factory()
+    change(UserService(db))
+    db.close()
+
+
+def test_key_loses_write_access_with_its_owner(api, login):
+    """Revoking admin rights turns catalog writes with the owner's write key into 403s"""
+    key = create_key(api, login()["headers"], ["catalog:read", "catalog:write"])
+    assert api.post("/api/v1/products/", json=new_product("Before"), headers=key).status_code == 200
+
+    update_owner(api, lambda users: users.set_superuser(1, False))
+    assert api.post("/api/v1/products/", json=new_product("After"), headers=key).status_code == 403
+    assert api.get("/api/v1/products/", headers=key).status_code == 200
+
+
+def test_key_of_deactivated_owner_is_rejected(api, login):
+    """A deactivated owner's keys stop working, for writes and reads"""
+    key = create_key(api, login()["headers"], ["catalog:read", "catalog:write"])
+    assert api.get("/api/v1/products/", headers=key).status_code == 200
+
+    update_owner(api, lambda users: users.deactivate_user(1))
+    assert api.post("/api/v1/products/", json=new_product("After"), headers=key).status_code == 401
+    assert api.get("/api/v1/products/", headers=key).status_code == 401
+
+
+def test_key_is_refused_outside_the_catalog(api, login):
+    """An admin's write key does not open admin-only routes such as diagnostics"""
+    headers = login()["headers"]
+    key = create_key(api, headers, ["catalog:read", "catalog:write"])
+    assert api.get("/api/v1/diagnostics/", headers=headers).status_code == 200
+    assert api.get("/api/v1/diagnostics/", headers=key).status_code == 401
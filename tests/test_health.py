@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Readiness probe checks
+
+/health/ready answers 200 while every probe passes and the worker has
+headroom, and 503 with the reason otherwise: "unavailable" when a
+dependency fails its probe, "overloaded" when too many requests are in
+flight or a pool is nearly exhausted. Every feature configured to use
+Redis gets a probe.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core import health, read_replicas
+from app.core.config import settings
+from app.core.health import CachedProbe
+from app.core.idempotency import idempotency_store
+
+
+async def passes():
+    pass
+
+
+async def fails():
+    raise ConnectionError("connection refused")
+
+
+class Redis:
+    """Stand-in for a feature's Redis client"""
+
+    async def ping(self):
+        pass
+
+
+@pytest.fixture
+def ready(monkeypatch):
+    """Probes that pass, an idle worker and a pool with room to spare"""
+    monkeypatch.setattr(health, "probes", [CachedProbe("database", passes, ttl=0, timeout=1)])
+    monkeypatch.setattr(health, "pool_stats", lambda: {"primary": {"size": 5, "max_overflow": 5, "in_use": 1}})
+    monkeypatch.setattr(settings, "HEALTH_MAX_IN_FLIGHT", 10)
+    monkeypatch.setattr(settings, "HEALTH_MAX_POOL_UTILIZATION", 0.9)
+
+
+def test_ready(api, ready):
+    response = api.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["pools"]["primary"]["utilization"] == 0.1
+
+
+def test_failed_probe_is_unavailable(api, ready, monkeypatch):
+    monkeypatch.setattr(health, "probes", [
+        CachedProbe("database", passes, ttl=0, timeout=1),
+        CachedProbe("idempotency_cache", fails, ttl=0, timeout=1),
+    ])
+    response = api.get("/health/ready")
+    assert response.status_code == 503
+    report = response.json()
+    assert report["status"] == "unavailable"
+    assert report["checks"]["database"]["status"] == "ok"
+    assert report["checks"]["idempotency_cache"]["status"] == "error"
+    assert report["checks"]["idempotency_cache"]["error"] == "connection refused"
+
+
+def test_too_many_requests_in_flight_is_overloaded(api, ready, monkeypatch):
+    monkeypatch.setattr(health, "_in_flight", settings.HEALTH_MAX_IN_FLIGHT)  # Plus the readiness request itself
+    response = api.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "overloaded"
+    assert response.json()["overloaded"] == ["11 requests in flight (limit 10)"]
+
+
+def test_exhausted_pool_is_overloaded(api, ready, monkeypatch):
+    monkeypatch.setattr(health, "pool_stats", lambda: {"primary": {"size": 5, "max_overflow": 5, "in_use": 9}})
+    response = api.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["overloaded"] == ["pool primary 90% in use"]
+
+
+def test_every_redis_feature_is_probed(monkeypatch):
+    for name in ("RATE_LIMIT_BACKEND", "IDEMPOTENCY_BACKEND", "REPLICA_READ_YOUR_WRITES_BACKEND"):
+        monkeypatch.setattr(settings, name, "redis")
+    monkeypatch.setattr(health, "rate_limit_backend", Redis())
+    monkeypatch.setattr(idempotency_store, "backend", Redis())
+    monkeypatch.setattr(read_replicas, "write_markers", Redis())
+    assert [probe.name for probe in health._create_probes()] == [
+        "database", "rate_limit_cache", "idempotency_cache", "write_marker_cache"
+    ]
+
+
+def test_memory_backends_are_not_probed(monkeypatch):
+    for name in ("RATE_LIMIT_BACKEND", "REPLICA_READ_YOUR_WRITES_BACKEND"):
+        monkeypatch.setattr(settings, name, "memory")
+    monkeypatch.setattr(settings, "IDEMPOTENCY_BACKEND", "database")
+    assert [probe.name for probe in health._create_probes()] == ["database"]
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Idempotency-Key checks on order creation
+
+A retry with the same key and body replays the first response, the same
+key with another body is refused, and a request that fails, in the
+endpoint or in its commit, gives the key up so the retry runs again.
+Duplicates arriving while the first request runs wait for it and replay;
+a duplicate from another worker waits on the claim's row lock without
+blocking its event loop.
+"""
+
+import asyncio
+import os
+import sys
+from decimal import Decimal
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core import unit_of_work
+from app.db.base import Base
+from app.core.idempotency import REPLAYED_HEADER, DatabaseIdempotencyBackend, StoredResponse, idempotency_store
+from app.models.order import Order
+from app.models.product import Product
+
+ORDER = {"items": [{"product_id": 1, "quantity": 2}]}
+
+
+@pytest.fixture
+def buyer(api, login):
+    """Bearer headers of a customer, with one product in the catalog"""
+    db = api.session_factory()
+    db.add(Product(name="Template", slug="template", price=Decimal("9.99")))
+    db.commit()
+    db.close()
+    return login("customer")["headers"]
+
+
+def place(api, headers, key, body=ORDER):
+    return api.post("/api/v1/orders/", json=body, headers={**headers, "Idempotency-Key": key})
+
+
+def order_count(api):
+    db = api.session_factory()
+    count = db.scalar(select(func.count()).select_from(Order))
+    db.close()
+    return count
+
+
+def test_retry_replays_the_first_response(api, buyer):
+    first = place(api, buyer, "retry")
+    assert first.status_code == 200 and REPLAYED_HEADER not in first.headers
+
+    replay = place(api, buyer, "retry")
+    assert replay.status_code == 200 and replay.headers[REPLAYED_HEADER] == "true"
+    assert replay.json() == first.json()
+    assert order_count(api) == 1
+
+
+def test_reusing_a_key_for_another_body_is_refused(api, buyer):
+    assert place(api, buyer, "reused").status_code == 200
+    other = place(api, buyer, "reused", {"items": [{"product_id": 1, "quantity": 3}]})
+    assert other.status_code == 422
+    assert order_count(api) == 1
+
+
+def test_key_is_released_after_an_error_response(api, buyer):
+    """A 400 is not stored: the corrected retry with the same key places the order"""
+    assert place(api, buyer, "fixed", {"items": [{"product_id": 99}]}).status_code == 400
+    response = place(api, buyer, "fixed")
+    assert response.status_code == 200 and REPLAYED_HEADER not in response.headers
+    assert order_count(api) == 1
+
+
+def test_key_is_released_when_the_commit_fails(api, buyer, monkeypatch):
+    commit_request = unit_of_work.commit_request
+
+    async def failing_commit(sessions):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(unit_of_work, "commit_request", failing_commit)
+    with pytest.raises(RuntimeError):
+        place(api, buyer, "commit")
+    assert idempotency_store._in_flight == {}
+    assert order_count(api) == 0
+
+    monkeypatch.setattr(unit_of_work, "commit_request", commit_request)
+    response = place(api, buyer, "commit")
+    assert response.status_code == 200 and REPLAYED_HEADER not in response.headers
+    assert order_count(api) == 1
+
+
+def test_concurrent_duplicates_place_one_order(api, buyer, monkeypatch):
+    """Duplicates that arrive while the first request runs wait for it and replay its response"""
+    claim = idempotency_store.backend.claim
+
+    async def slow_claim(db, key, request_hash):
+        stored = await claim(db, key, request_hash)
+        await asyncio.sleep(0.1)  # Let the duplicates arrive while this request holds the key
+        return stored
+
+    monkeypatch.setattr(idempotency_store.backend, "claim", slow_claim)
+
+    async def place_concurrently():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {**buyer, "Idempotency-Key": "concurrent"}
+            return await asyncio.gather(*(
+                client.post("/api/v1/orders/", json=ORDER, headers=headers) for _ in range(3)
+            ))
+
+    responses = asyncio.run(place_concurrently())
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert sum(REPLAYED_HEADER in response.headers for response in responses) == 2
+    assert len({response.json()["order_number"] for response in responses}) == 1
+    assert order_count(api) == 1
+
+
+def test_duplicate_from_another_worker_waits_off_the_event_loop(tmp_path):
+    """The claim INSERT blocks on the first worker's transaction in a thread while the loop keeps running"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'keys.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    first, duplicate = session_factory(), session_factory()
+    backend = DatabaseIdempotencyBackend()
+
+    async def run():
+        assert await backend.claim(first, "key", "hash") is None
+        waiting = asyncio.create_task(backend.claim(duplicate, "key", "hash"))
+        ticks = 0
+        while ticks < 20:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not waiting.done()
+        backend.stage(first, "key", StoredResponse("hash", 200, b"{}"))  # Commits outside a unit of work
+        return await waiting
+
+    assert asyncio.run(run()) == StoredResponse("hash", 200, b"{}")
+    first.close()
+    duplicate.close()
+    engine.dispose()
+
+
+def test_claim_refuses_a_session_with_staged_changes(tmp_path):
+    """A duplicate's rollback would drop earlier changes, so the claim must come first"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'keys.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Product(name="Staged", slug="staged", price=Decimal("1.00")))
+    with pytest.raises(RuntimeError):
+        asyncio.run(DatabaseIdempotencyBackend().claim(db, "key", "hash"))
+    db.close()
+    engine.dispose()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Property tests for the order number generator
+
+Order numbers are generated without a database lookup, so these check the
+properties that make that safe: numbers are unique across threads, worker
+ids and processes started with the same instance id, whether forked or
+spawned, strictly increasing per generator (even when the clock stalls or
+steps back), and their text sorts like the ids behind it. Outside
+development the API refuses to start without an assigned instance id.
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.utils.order_number import (
+    ALPHABET, ENCODED_LENGTH, MAX_WORKER_ID, PROCESS_BITS, OrderNumberGenerator, create_generator, decode, encode,
+    split_id
+)
+
+SAMPLES = 10000
+needs_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+
+
+class SteppedClock:
+    """Clock that replays a list of readings, then repeats the last one"""
+
+    def __init__(self, readings):
+        self._readings = list(readings)
+
+    def __call__(self) -> float:
+        return self._readings.pop(0) if len(self._readings) > 1 else self._readings[0]
+
+
+def test_encoding_round_trips_and_preserves_order():
+    """decode(encode(x)) == x, fixed width, and text order matches numeric order"""
+    rng = random.Random(49)
+    values = [rng.getrandbits(64) for _ in range(SAMPLES)] + [0, (1 << 64) - 1]
+    for value in values:
+        text = encode(value)
+        assert len(text) == ENCODED_LENGTH
+        assert set(text) <= set(ALPHABET)
+        assert decode(text) == value
+
+    for a, b in zip(values, reversed(values)):
+        assert (encode(a) < encode(b)) == (a < b)
+
+
+def test_ids_strictly_increase():
+    """Consecutive ids from one generator strictly increase on the real clock"""
+    generator = OrderNumberGenerator(worker_id=1)
+    ids = [generator.next_id() for _ in range(SAMPLES * 10)]
+    assert all(a < b for a, b in zip(ids, ids[1:]))
+
+
+@pytest.mark.parametrize("readings", [
+    [1800000000.0],  # frozen clock: sequence runs out many times
+    [1800000000.5, 1800000000.0, 1799999999.0],  # clock steps back
+])
+def test_ids_increase_when_clock_stalls_or_steps_back(readings):
+    """Running out of sequence or a clock regression never repeats or reorders ids"""
+    generator = OrderNumberGenerator(worker_id=7, clock=SteppedClock(readings))
+    ids = [generator.next_id() for _ in range(SAMPLES)]
+    assert all(a < b for a, b in zip(ids, ids[1:]))
+    assert {split_id(value)[1] for value in ids} == {7}
+
+
+def test_id_fields():
+    """An id carries the generation time and the worker id"""
+    generator = OrderNumberGenerator(worker_id=MAX_WORKER_ID)
+    before = int(time.time() * 1000)
+    timestamp, worker_id, sequence = split_id(decode(generator.next()[len(generator.prefix):]))
+    assert before <= timestamp <= int(time.time() * 1000)
+    assert worker_id == MAX_WORKER_ID
+    assert sequence == 0
+
+    with pytest.raises(ValueError):
+        OrderNumberGenerator(worker_id=MAX_WORKER_ID + 1)
+
+
+def test_unique_across_threads():
+    """Threads sharing a generator never get the same number"""
+    generator = OrderNumberGenerator(worker_id=3)
+    results = [[] for _ in range(8)]
+
+    def worker(out):
+        out.extend(generator.next() for _ in range(SAMPLES * 2))
+
+    threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    numbers = [number for out in results for number in out]
+    assert len(set(numbers)) == len(numbers)
+
+
+def _generate(worker_id):
+    """Numbers from a fresh generator in a child process"""
+    generator = OrderNumberGenerator(worker_id=worker_id)
+    return [generator.next() for _ in range(SAMPLES * 2)]
+
+
+_inherited = None  # set before forking, so children use the parent's generator
+
+
+def _generate_inherited(_):
+    """Numbers from the generator inherited through fork"""
+    return os.getpid(), _inherited.worker_id, [_inherited.next() for _ in range(SAMPLES)]
+
+
+@needs_fork
+def test_unique_across_processes_with_distinct_worker_ids():
+    """Processes with different worker ids never collide, even in the same millisecond"""
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        batches = pool.map(_generate, [0, 1, 2, MAX_WORKER_ID])
+    numbers = [number for batch in batches for number in batch]
+    assert len(set(numbers)) == len(numbers)
+
+
+@needs_fork
+def test_forked_workers_lease_their_own_worker_id(tmp_path):
+    """A generator inherited through fork leases a new worker id in each child, under the same instance"""
+    global _inherited
+    generator = _inherited = create_generator(5, lock_dir=str(tmp_path))
+    parent_numbers = [generator.next() for _ in range(SAMPLES)]
+
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        results = pool.map(_generate_inherited, range(4), chunksize=1)
+
+    pids = {pid for pid, _, _ in results}
+    worker_ids = {worker_id for _, worker_id, _ in results}
+    assert len(worker_ids) == len(pids) and generator.worker_id not in worker_ids
+    assert {worker_id >> PROCESS_BITS for worker_id in worker_ids | {generator.worker_id}} == {5}
+
+    numbers = parent_numbers + [number for _, _, batch in results for number in batch]
+    assert len(set(numbers)) == len(numbers)
+
+
+def _generate_configured(lock_dir, started, results):
+    """Numbers from a process started like a uvicorn worker, with the shared instance id 3"""
+    generator = create_generator(3, lock_dir=lock_dir)
+    started.wait()  # Both processes hold their lease and generate at the same time
+    results.put((generator.worker_id, [generator.next() for _ in range(SAMPLES)]))
+
+
+def test_spawned_workers_with_the_same_instance_id_never_collide(tmp_path):
+    """Two processes configured with one instance id get distinct worker ids"""
+    context = multiprocessing.get_context("spawn")
+    started, results = context.Barrier(2), context.Queue()
+    processes = [
+        context.Process(target=_generate_configured, args=(str(tmp_path), started, results)) for _ in range(2)
+    ]
+    for process in processes:
+        process.start()
+    batches = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+
+    assert len({worker_id for worker_id, _ in batches}) == 2
+    numbers = [number for _, batch in batches for number in batch]
+    assert len(set(numbers)) == len(numbers)
+
+
+@pytest.mark.parametrize("environment, instance_id, starts", [
+    ("production", None, False),
+    ("production", 7, True),
+    ("development", None, True),
+])
+def test_startup_requires_instance_id_outside_development(tmp_path, monkeypatch, environment, instance_id, starts):
+    monkeypatch.setattr(settings, "UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "ENVIRONMENT", environment)
+    monkeypatch.setattr(settings, "ORDER_NUMBER_INSTANCE_ID", instance_id)
+    if starts:
+        with TestClient(app):
+            pass
+    else:
+        with pytest.raises(RuntimeError, match="ORDER_NUMBER_INSTANCE_ID"):
+            with TestClient(app):
+                pass
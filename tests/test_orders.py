@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Order placement checks
+
+OrderService.create_order on the scratch database: repeated lines merge
+into one item, items snapshot the product's name and price (zero for free
+products), the total and its pending payment add up, purchase counters
+grow by the quantities bought, and an order naming an unknown or inactive
+product is refused without writing anything.
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import func, select
+
+from app.models.order import Order, OrderStatus
+from app.models.payment import PaymentStatus
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.order import OrderCreate
+from app.services.order_service import OrderError, OrderService
+
+
+@pytest.fixture
+def db(api):
+    """Session on the scratch database with four products: two paid, one free, one inactive"""
+    db = api.session_factory()
+    db.add_all([
+        Product(name="Template", slug="template", price=Decimal("9.99"), download_limit=3),
+        Product(name="Icons", slug="icons", price=Decimal("5.00")),
+        Product(name="Sampler", slug="sampler", price=Decimal("4.00"), is_free=True),
+        Product(name="Retired", slug="retired", price=Decimal("1.00"), is_active=False),
+    ])
+    db.commit()
+    yield db
+    db.close()
+
+
+def place(db, *items):
+    customer = db.scalars(select(User).where(User.username == "customer")).one()
+    order_data = OrderCreate(items=[{"product_id": product_id, "quantity": quantity} for product_id, quantity in items])
+    return OrderService(db).create_order(customer, order_data)
+
+
+def purchase_counts(db):
+    db.expire_all()
+    return dict(db.execute(select(Product.slug, Product.purchase_count).order_by(Product.id)).all())
+
+
+def test_items_snapshot_the_catalog_and_add_up(db):
+    order = place(db, (1, 2), (2, 1), (1, 1), (3, 1))
+
+    items = {item.product_id: item for item in order.order_items}
+    assert [(item.product_name, item.product_price, item.quantity, item.subtotal) for item in items.values()] == [
+        ("Template", Decimal("9.99"), 3, Decimal("29.97")),
+        ("Icons", Decimal("5.00"), 1, Decimal("5.00")),
+        ("Sampler", Decimal("0.00"), 1, Decimal("0.00")),
+    ]
+    assert items[1].download_limit == 3
+    assert order.total_amount == Decimal("34.97")
+    assert order.status == OrderStatus.PENDING
+    assert [payment.amount for payment in order.payments] == [Decimal("34.97")]
+    assert order.payment_status == PaymentStatus.PENDING.value
+
+    # Later catalog edits leave the placed order alone
+    template = db.get(Product, 1)
+    template.name, template.price = "Template v2", Decimal("19.99")
+    db.commit()
+    db.expire_all()
+    item = next(item for item in db.get(Order, order.id).order_items if item.product_id == 1)
+    assert (item.product_name, item.product_price) == ("Template", Decimal("9.99"))
+
+
+def test_free_order_completes_without_a_payment(db):
+    order = place(db, (3, 2))
+    assert order.total_amount == Decimal("0.00")
+    assert order.status == OrderStatus.COMPLETED and order.completed_at is not None
+    assert order.payments == []
+
+
+def test_purchase_counters_grow_by_the_quantities(db):
+    place(db, (1, 2), (3, 1))
+    place(db, (1, 1), (2, 4))
+    assert purchase_counts(db) == {"template": 3, "icons": 4, "sampler": 1, "retired": 0}
+
+
+def test_unknown_and_inactive_products_are_refused(db):
+    with pytest.raises(OrderError) as error:
+        place(db, (1, 1), (99, 1), (4, 1))
+    assert error.value.product_ids == [4, 99]
+
+    db.rollback()
+    assert db.scalar(select(func.count()).select_from(Order)) == 0
+    assert purchase_counts(db) == {"template": 0, "icons": 0, "sampler": 0, "retired": 0}
+
+
+def test_order_numbers_are_unique(db):
+    numbers = {place(db, (2, 1)).order_number for _ in range(3)}
+    assert len(numbers) == 3
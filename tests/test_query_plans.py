@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Query plan checks for the backend services
+
+Runs every service query against a seeded SQLite database, EXPLAINs each
+captured statement and fails when a table is scanned, whether row by row or
+by walking a whole index, instead of searched through an index. Scans that
+are expected are listed per case with the reason.
+"""
+
+import asyncio
+import os
+import re
+import sys
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.core.idempotency import DatabaseIdempotencyBackend, StoredResponse
+from app.models.product import Product, ProductCategory
+from app.models.token import RevokedToken
+from app.models.user import User
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.schemas.product import ProductBulkFilter, ProductCreate, ProductUpdate
+from app.services.api_key_service import ApiKeyService
+from app.services.order_service import OrderService
+from app.services.product_service import ProductService
+from app.services.token_service import TokenRevocationStore
+from app.services.user_service import UserService
+
+# "SCAN t" reads every row of t and "SCAN t USING [COVERING] INDEX i" walks all
+# of index i; only "SEARCH t USING ..." narrows the rows read by an index
+FULL_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    category = ProductCategory(name="Templates", slug="templates")
+    session.add(category)
+    session.flush()
+    session.add_all(
+        Product(name=f"Product {i}", slug=f"product-{i}", price=Decimal("9.99"), category_id=category.id)
+        for i in range(200)
+    )
+    session.add(User(email="user@example.com", username="user", hashed_password="x"))
+    session.add(RevokedToken(jti="revoked", expires_at=datetime.utcnow() + timedelta(days=1)))
+    # No ANALYZE: without statistics SQLite plans as if every table were
+    # large, so the plans show whether an index can serve each query
+    session.commit()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        # EXPLAIN one parameter set of an executemany
+        statements.append((statement, parameters[0] if executemany else parameters))
+
+    session.info["statements"] = statements
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def full_scans(session, statement, parameters):
+    """Tables the statement scans instead of searching"""
+    plan = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return {match.group(1) for row in plan for match in [FULL_SCAN.match(row[-1])] if match}
+
+
+def place_order(db):
+    """Order two of the seeded products as the seeded user"""
+    order_data = OrderCreate(items=[OrderItemCreate(product_id=3), OrderItemCreate(product_id=7, quantity=2)])
+    return OrderService(db).create_order(db.get(User, 1), order_data)
+
+
+def claim_idempotency_key(db):
+    """Claim, complete and commit a key, then claim it again (the replay lookup)"""
+    backend = DatabaseIdempotencyBackend()
+    asyncio.run(backend.claim(db, "key", "hash"))
+    backend.stage(db, "key", StoredResponse("hash", 200, b"{}"))
+    db.commit()
+    return asyncio.run(backend.claim(db, "key", "hash"))
+
+
+CASES = {
+    # The category list is a small lookup table read in full on purpose
+    "get_categories": (lambda db: ProductService(db).get_categories(), {"product_categories"}),
+    "get_category_by_id": (lambda db: ProductService(db).get_category_by_id(1), set()),
+    # Newest-first listings walk ix_products_active_created_at in order and
+    # stop after LIMIT matching rows, instead of sorting every match
+    "get_products": (lambda db: ProductService(db).get_products(), {"products"}),
+    "get_products_by_category": (lambda db: ProductService(db).get_products(category_id=1), set()),
+    "get_products_free": (lambda db: ProductService(db).get_products(is_free=True), {"products"}),
+    "get_products_search": (lambda db: ProductService(db).get_products(search="product"), {"products"}),
+    "get_featured_products": (lambda db: ProductService(db).get_featured_products(), {"products"}),
+    "get_product_by_id": (lambda db: ProductService(db).get_product_by_id(5), set()),
+    "get_product_by_slug": (lambda db: ProductService(db).get_product_by_slug("product-5"), set()),
+    "create_product": (
+        lambda db: ProductService(db).create_product(ProductCreate(name="New", slug="new", price=Decimal("1.00"))),
+        set(),
+    ),
+    "update_product": (lambda db: ProductService(db).update_product(5, ProductUpdate(price=Decimal("5.00"))), set()),
+    "delete_product": (lambda db: ProductService(db).delete_product(5), set()),
+    "bulk_update_by_ids": (
+        lambda db: ProductService(db).bulk_update_products(ProductBulkFilter(ids=[1, 2]), ProductUpdate(is_featured=True)),
+        set(),
+    ),
+    "bulk_update_by_category": (
+        lambda db: ProductService(db).bulk_update_products(ProductBulkFilter(category_id=1), ProductUpdate(is_featured=True)),
+        set(),
+    ),
+    # Price ranges are unindexed, so this walks the active-products index;
+    # bulk price updates are rare admin operations
+    "bulk_delete_by_price": (
+        lambda db: ProductService(db).bulk_delete_products(ProductBulkFilter(min_price=Decimal("100"))),
+        {"products"},
+    ),
+    "increment_view_count": (lambda db: ProductService(db).increment_view_count(5), set()),
+    "get_user_by_id": (lambda db: UserService(db).get_user_by_id(1), set()),
+    "get_user_by_email": (lambda db: UserService(db).get_user_by_email("user@example.com"), set()),
+    "get_user_by_username": (lambda db: UserService(db).get_user_by_username("user"), set()),
+    "get_token_version": (lambda db: UserService(db).get_token_version(1), set()),
+    "find_conflicts": (lambda db: UserService(db).find_conflicts("user@example.com", "user"), set()),
+    "authenticate_user": (lambda db: asyncio.run(UserService(db).authenticate_user("nobody", "x")), set()),
+    "update_user_activation": (lambda db: UserService(db).deactivate_user(1), set()),
+    "get_user_api_keys": (lambda db: ApiKeyService(db).get_user_api_keys(1), set()),
+    "authenticate_api_key": (lambda db: ApiKeyService(db).authenticate("dpk_missing_key"), set()),
+    "token_revocation_sync": (lambda db: TokenRevocationStore().is_revoked(db, "jti"), set()),
+    "create_order": (lambda db: place_order(db), set()),
+    # Orders are placed first so the item loads run too
+    "get_user_orders": (lambda db: (place_order(db), OrderService(db).get_user_orders(1)), set()),
+    "get_user_order": (lambda db: OrderService(db).get_user_order(1, place_order(db).id), set()),
+    "idempotency_claim": (claim_idempotency_key, set()),
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_service_query_uses_indexes(db, name):
+    """Every statement a service issues avoids unexpected full table scans"""
+    run, allowed = CASES[name]
+    run(db)
+    statements = [
+        (statement, parameters)
+        for statement, parameters in db.info["statements"]
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))
+    ]
+    assert statements, f"{name} issued no queries"
+
+    for statement, parameters in statements:
+        scans = full_scans(db, statement, parameters) - allowed
+        assert not scans, f"{name}: full scan of {', '.join(sorted(scans))} in\n{statement}"
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Rate limiter checks
+
+Token buckets on a controlled clock: a full bucket allows its capacity,
+then refuses with the wait until the next token, and refills at the
+configured rate. cost=0 only looks at the bucket. RateLimiter raises 429
+with Retry-After and counts allowed and rejected requests. On login only
+failed attempts are charged, per username and client.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import HTTPException
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitBackend, RateLimiter, parse_rate, rate_limit_stats
+from conftest import PASSWORD
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Rate limiting on, with empty in-memory buckets"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "rate_limit_backend", MemoryRateLimitBackend())
+
+
+def hits(backend, count, cost=1):
+    rate, capacity = parse_rate("3/minute")
+    return [asyncio.run(backend.hit("key", rate, capacity, cost)) for _ in range(count)]
+
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == (10 / 60, 10)
+    assert parse_rate("5/seconds") == (5.0, 5)
+
+
+def test_bucket_empties_then_refills(clock):
+    backend = MemoryRateLimitBackend()
+    assert [allowed for allowed, _ in hits(backend, 3)] == [True, True, True]
+    allowed, retry_after = hits(backend, 1)[0]
+    assert not allowed and retry_after == pytest.approx(20)
+
+    clock.now += 20  # One token at 3/minute
+    assert [allowed for allowed, _ in hits(backend, 2)] == [True, False]
+
+    clock.now += 60  # Refills to capacity, not beyond
+    assert [allowed for allowed, _ in hits(backend, 4)] == [True, True, True, False]
+
+
+def test_zero_cost_only_looks(clock):
+    backend = MemoryRateLimitBackend()
+    assert all(allowed for allowed, _ in hits(backend, 10, cost=0))
+    assert [allowed for allowed, _ in hits(backend, 4)] == [True, True, True, False]
+    assert not hits(backend, 1, cost=0)[0][0]
+
+
+def test_limiter_raises_429_with_retry_after_and_counts(clock, limits):
+    limiter = RateLimiter("test_limiter", "2/minute")
+    for _ in range(2):
+        asyncio.run(limiter.check("client"))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(limiter.check("client"))
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "30"
+    asyncio.run(limiter.check("other-client"))
+    assert rate_limit_stats["test_limiter"] == {"allowed": 3, "rejected": 1}
+
+
+def login(api, username, password):
+    return api.post("/api/v1/auth/login", data={"username": username, "password": password})
+
+
+def test_only_failed_logins_count_against_the_username(api, limits):
+    """Successful logins never use up the per-username budget; failed ones do"""
+    budget = int(settings.RATE_LIMIT_LOGIN_USER.partition("/")[0])
+    # Stays under the per-IP limit on /auth (RATE_LIMIT_AUTH) for the whole test
+    for _ in range(3):
+        assert login(api, "customer", PASSWORD).status_code == 200
+    for _ in range(budget):
+        assert login(api, "customer", "wrong").status_code == 401
+
+    refused = login(api, "customer", PASSWORD)
+    assert refused.status_code == 429 and "Retry-After" in refused.headers
+    # Attempts against another account are not affected
+    assert login(api, "admin", PASSWORD).status_code == 200
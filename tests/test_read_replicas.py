@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Read replica routing checks
+
+Two SQLite files stand in for the primary and a replica, each holding a
+product with a different name, so every read shows where it was sent. The
+catalog's cached lambda statements are routed like plain SELECTs, replicas
+are health-checked in the background, and a client that just wrote reads
+from the primary: per user or API key through the write marker store, or
+through its last_write cookie when anonymous.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.core.config import settings
+from app.core import read_replicas
+from app.core.read_replicas import (
+    LAST_WRITE_COOKIE, MemoryWriteMarkers, ReplicaRouter, RoutingSession, track_read_client
+)
+from app.core.security import create_access_token
+from app.models.product import Product
+from app.services.product_service import AsyncProductService, ProductService
+
+
+def product_database(path, name):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Product(name=name, slug="item", price=Decimal("1.00")))
+    db.commit()
+    db.close()
+    return engine
+
+
+def wait_until_healthy(router):
+    deadline = time.monotonic() + 5
+    while router.choose() is None:
+        assert time.monotonic() < deadline, "replica never passed its health check"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = product_database(tmp_path / "primary.db", "primary")
+    replica = product_database(tmp_path / "replica.db", "replica")
+    router = ReplicaRouter([replica], check_interval=0.05)
+    wait_until_healthy(router)
+    yield sessionmaker(bind=primary, class_=RoutingSession, router=router)
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.fixture
+def client(databases, monkeypatch):
+    monkeypatch.setattr(read_replicas, "write_markers", MemoryWriteMarkers())
+    app = FastAPI()
+    app.middleware("http")(track_read_client)
+
+    @app.get("/name")
+    def read_name():
+        with databases() as db:
+            return db.execute(select(Product.name)).scalar_one()
+
+    @app.post("/touch")
+    def touch():
+        with databases() as db:
+            db.execute(update(Product).values(price=Decimal("2.00")))
+            db.commit()
+        return {}
+
+    return TestClient(app)
+
+
+def test_unchecked_and_dead_replicas_are_skipped(tmp_path):
+    """choose() never connects itself; a replica serves reads only after passing a background check"""
+    dead = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter([dead], check_interval=0.05)
+    assert router.choose() is None
+    time.sleep(0.2)
+    assert router.choose() is None
+    assert router.status()[0]["healthy"] is False
+
+
+def test_reads_go_to_the_replica(client):
+    assert client.get("/name").json() == "replica"
+
+
+def test_catalog_lambda_statements_read_from_the_replica(databases):
+    with databases() as db:
+        service = ProductService(db)
+        assert [product.name for product in service.get_products()] == ["replica"]
+        assert service.get_product_by_id(1).name == "replica"
+        assert service.get_product_by_slug("item").name == "replica"
+
+
+def test_async_catalog_reads_from_the_replica(tmp_path):
+    """The async router checks replicas through their sync engines"""
+    primary = product_database(tmp_path / "primary.db", "primary")
+    replica = product_database(tmp_path / "replica.db", "replica")
+    async_primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}", poolclass=NullPool)
+    async_replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+    router = ReplicaRouter([async_replica.sync_engine], check_interval=0.05, probe_engines=[replica])
+    wait_until_healthy(router)
+    session_factory = async_sessionmaker(
+        async_primary, class_=AsyncSession, sync_session_class=RoutingSession, router=router
+    )
+
+    async def read():
+        async with session_factory() as db:
+            service = AsyncProductService(db)
+            return [product.name for product in await service.get_products()], (await service.get_product_by_id(1)).name
+
+    assert asyncio.run(read()) == (["replica"], "replica")
+    primary.dispose()
+    replica.dispose()
+
+
+def test_writer_reads_from_the_primary_until_the_window_passes(client):
+    """The last_write cookie, not worker memory, keeps the writer's reads on the primary"""
+    response = client.post("/touch")
+    assert LAST_WRITE_COOKIE in response.cookies
+    assert client.get("/name").json() == "primary"
+
+    # Another client, or the same one on a fresh worker without the cookie, reads the replica
+    assert TestClient(client.app).get("/name").json() == "replica"
+
+    client.cookies.set(LAST_WRITE_COOKIE, str(time.time() - settings.REPLICA_READ_YOUR_WRITES_SECONDS - 1))
+    assert client.get("/name").json() == "replica"
+
+
+def bearer(user_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def test_user_reads_own_writes_without_cookies(client):
+    """A client without a cookie jar (API, server-to-server) still reads its writes, even with a new token"""
+    app = client.app
+    assert TestClient(app).post("/touch", headers=bearer(1)).status_code == 200
+
+    assert TestClient(app).get("/name", headers=bearer(1)).json() == "primary"
+    assert TestClient(app).get("/name", headers=bearer(2)).json() == "replica"
+
+
+def test_api_key_reads_own_writes(client):
+    key = {"X-API-Key": "dpk_example"}
+    TestClient(client.app).post("/touch", headers=key)
+    assert TestClient(client.app).get("/name", headers=key).json() == "primary"
+    assert TestClient(client.app).get("/name", headers={"X-API-Key": "dpk_other"}).json() == "replica"
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Server-Timing header checks
+
+Query counts and DB time per request stay out of responses unless the
+header is enabled or the app runs in development.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core.config import settings
+
+
+def test_header_is_off_outside_development(api, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    assert "Server-Timing" not in api.get("/api/v1/products/").headers
+
+    monkeypatch.setattr(settings, "SQL_SERVER_TIMING_HEADER", True)
+    assert api.get("/api/v1/products/").headers["Server-Timing"].startswith("db;")
+
+
+def test_header_is_sent_in_development(api, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "development")
+    assert "Server-Timing" in api.get("/api/v1/products/").headers
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Slug allocation checks
+
+Runs allocate_slugs against an in-memory SQLite catalog: collisions with the
+table and within a batch get -2, -3... suffixes, and long names whose suffix
+has to cut into the name still never reuse a stored slug. Renaming one
+product allocates its slug the same way, ignoring only its own. Bulk
+renames, which suffix the slug with the product id, refuse slugs held by
+other products and stay within the column.
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.models.product import Product
+from app.schemas.product import ProductBulkFilter, ProductUpdate
+from app.services.product_service import ProductService, SlugConflictError
+from app.utils.slug import allocate_slug, allocate_slugs
+
+MAX_LENGTH = Product.slug.type.length
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_products(db, slugs):
+    db.add_all(Product(name=slug, slug=slug, price=Decimal("1.00")) for slug in slugs)
+    db.commit()
+
+
+def test_collisions_get_suffixes(db):
+    """Stored slugs and earlier slugs in the batch are skipped; look-alike prefixes are not"""
+    add_products(db, ["sale", "sale-2", "salesman", "sale-2x"])
+    assert allocate_slugs(db, Product.slug, ["sale", "sale", "salesman", "new"]) == [
+        "sale-3", "sale-4", "salesman-2", "new"
+    ]
+
+
+def test_long_names_fit_and_skip_truncated_collisions(db):
+    """A suffix that shortens a full-length name is checked against the table too"""
+    name = "a" * (MAX_LENGTH + 10)
+    add_products(db, [name[:MAX_LENGTH], name[:MAX_LENGTH - 2] + "-2"])
+
+    slug = allocate_slug(db, Product.slug, name)
+    assert slug == name[:MAX_LENGTH - 2] + "-3"
+    assert len(slug) <= MAX_LENGTH
+
+
+def test_rename_skips_slugs_of_other_products(db):
+    """A product keeps its own slug, but never takes another product's"""
+    add_products(db, ["a", "b", "b-2"])
+    service = ProductService(db)
+    assert service.update_product(2, ProductUpdate(name="A")).slug == "a-2"
+    assert service.update_product(1, ProductUpdate(name="A")).slug == "a"
+    assert service.update_product(1, ProductUpdate(slug="b")).slug == "b"
+    assert [db.get(Product, product_id).slug for product_id in (1, 2, 3)] == ["b", "a-2", "b-2"]
+
+
+def test_rename_to_a_taken_slug_over_the_api(api, login):
+    db = api.session_factory()
+    add_products(db, ["a", "b"])
+    db.close()
+    headers = login()["headers"]
+    response = api.put("/api/v1/products/2", json={"name": "A"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["slug"] == "a-2"
+
+
+def test_bulk_rename_refuses_taken_slugs(db):
+    """Renaming product 1 to "Sale" while another product holds sale-1 is a conflict, not a 500"""
+    add_products(db, ["first", "sale-1"])
+    with pytest.raises(SlugConflictError) as error:
+        ProductService(db).bulk_update_products(ProductBulkFilter(ids=[1]), ProductUpdate(name="Sale"))
+    assert error.value.slugs == ["sale-1"]
+    assert db.get(Product, 1).slug == "first"
+
+
+def test_bulk_rename_fits_the_column(db):
+    """Long names are shortened so name-<id> fits, and a product may keep its own slug"""
+    add_products(db, ["first", "second", "sale-3"])
+    service = ProductService(db)
+    assert service.bulk_update_products(ProductBulkFilter(ids=[2, 3]), ProductUpdate(name="Sale")) == 2
+    assert [db.get(Product, product_id).slug for product_id in (2, 3)] == ["sale-2", "sale-3"]
+
+    service.bulk_update_products(ProductBulkFilter(ids=[1, 2]), ProductUpdate(name="b" * MAX_LENGTH))
+    db.expire_all()
+    slugs = [db.get(Product, product_id).slug for product_id in (1, 2)]
+    assert slugs == ["b" * (MAX_LENGTH - 2) + "-1", "b" * (MAX_LENGTH - 2) + "-2"]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Verified token cache checks
+
+decode_token verifies a token's signature once and reuses the payload,
+but never past the token's exp: cache entries live only as long as the
+token, a cached payload whose exp has passed is verified again, and an
+expired token is refused without being cached.
+"""
+
+import os
+import sys
+import time
+from datetime import timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import create_access_token, decode_token, token_cache
+
+
+@pytest.fixture
+def verifications(monkeypatch):
+    """Cleared cache; counts the signature checks decode_token makes"""
+    token_cache.clear()
+    calls = []
+    verify_token = security.verify_token
+
+    def counting_verify(token):
+        calls.append(token)
+        return verify_token(token)
+
+    monkeypatch.setattr(security, "verify_token", counting_verify)
+    yield calls
+    token_cache.clear()
+
+
+def cache_lifetime():
+    """Seconds the only cache entry has left"""
+    (_, expires_at), = token_cache._data.values()
+    return expires_at - time.monotonic()
+
+
+def test_token_is_verified_once(verifications):
+    token = create_access_token({"sub": "1"})
+    assert decode_token(token)["sub"] == "1"
+    assert decode_token(token)["sub"] == "1"
+    assert len(verifications) == 1
+
+
+def test_entry_lives_as_long_as_the_token(verifications):
+    decode_token(create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=5)))
+    assert 3 < cache_lifetime() <= 5
+
+    token_cache.clear()
+    decode_token(create_access_token({"sub": "1"}, expires_delta=timedelta(hours=2)))
+    assert cache_lifetime() > 7000  # Not capped by the cache's default TTL either
+
+
+def test_cached_payload_past_its_exp_is_verified_again(verifications, monkeypatch):
+    token = create_access_token({"sub": "1"})
+    exp = decode_token(token)["exp"]
+
+    # The entry is still in the cache, but by decode_token's clock the token has expired
+    monkeypatch.setattr(security.time, "time", lambda: exp + 1)
+    decode_token(token)
+    assert len(verifications) == 2
+
+
+def test_expired_token_is_refused_and_not_cached(verifications):
+    with pytest.raises(HTTPException) as error:
+        decode_token(create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1)))
+    assert error.value.status_code == 401
+    assert len(token_cache) == 0
+
+
+def test_callers_cannot_change_the_cached_payload(verifications):
+    token = create_access_token({"sub": "1"})
+    decode_token(token)["sub"] = "2"
+    assert decode_token(token)["sub"] == "1"
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Token revocation checks
+
+Store level: a worker picks up revocations made by another worker even when
+they commit out of id order, and purging expired revocations leaves the
+caller's transaction alone. API level: refresh tokens rotate, a used refresh
+token is rejected, and logout revokes both tokens.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+# Import base first to ensure all models are loaded
+from app.db.base import Base
+from app.core.config import settings
+from app.models.token import RevokedToken
+from app.services.token_service import TokenRevocationStore
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tokens.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_SYNC_SECONDS", 0)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def revoke_row(session_factory, jti, row_id=None, expires_in=timedelta(hours=1)):
+    """Revocation committed by "another worker", optionally with a chosen id"""
+    db = session_factory()
+    db.add(RevokedToken(id=row_id, jti=jti, expires_at=datetime.utcnow() + expires_in))
+    db.commit()
+    db.close()
+
+
+def test_sync_picks_up_revocations_committed_out_of_id_order(session_factory):
+    """A revocation whose id is below ones already seen still reaches other workers"""
+    worker = TokenRevocationStore()
+    db = session_factory()
+    revoke_row(session_factory, "first", row_id=100)
+    assert worker.is_revoked(db, "first")
+
+    # Allocated its id earlier but committed after "first" was synced
+    revoke_row(session_factory, "late", row_id=50)
+    assert worker.is_revoked(db, "late")
+    assert not worker.is_revoked(db, "never-revoked")
+    db.close()
+
+
+def test_compaction_leaves_the_callers_transaction_alone(session_factory):
+    """Expired revocations are purged without committing what the caller has staged"""
+    revoke_row(session_factory, "expired", expires_in=timedelta(hours=-1))
+    db = session_factory()
+    db.add(RevokedToken(jti="staged", expires_at=datetime.utcnow() + timedelta(hours=1)))
+
+    assert not TokenRevocationStore().is_revoked(db, "expired")
+    db.rollback()
+    db.close()
+
+    db = session_factory()
+    assert db.execute(select(RevokedToken.jti)).scalars().all() == []
+    db.close()
+
+
+def test_refresh_rotates_and_rejects_reuse(api, login):
+    """Each refresh token is exchanged once; the new one works, the old one is refused"""
+    tokens = login()
+    response = api.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    reused = api.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+    assert api.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 200
+
+
+def test_logout_revokes_access_and_refresh_tokens(api, login):
+    """After logout neither token is accepted"""
+    tokens = login()
+    assert api.get("/api/v1/auth/me", headers=tokens["headers"]).status_code == 200
+
+    response = api.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=tokens["headers"])
+    assert response.status_code == 200
+    assert api.get("/api/v1/auth/me", headers=tokens["headers"]).status_code == 401
+    assert api.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Unit of work checks
+
+A small app on UnitOfWorkRoute and the real get_db, over the scratch
+database of the ``api`` fixture. A request commits once however often it
+saves, an endpoint that raises commits nothing, after_commit callbacks
+wait for the commit, save(immediate=True) commits on the spot, and
+sessions opened by sync dependencies in the threadpool join the request.
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.unit_of_work import UnitOfWorkRoute, after_commit, save
+from app.models.product import Product
+
+
+def product(slug):
+    return Product(name=slug, slug=slug, price=Decimal("1.00"))
+
+
+def product_count(session_factory):
+    db = session_factory()
+    count = db.scalar(select(func.count()).select_from(Product))
+    db.close()
+    return count
+
+
+@pytest.fixture
+def uow(api):
+    """Client for the test routes, plus what they observed: commits and callback runs"""
+    session_factory = api.session_factory
+    engine = session_factory.kw["bind"]
+    seen = {"commits": 0, "callbacks": []}
+
+    def count_commit(connection):
+        seen["commits"] += 1
+
+    event.listen(engine, "commit", count_commit)
+    router = APIRouter(route_class=UnitOfWorkRoute)
+
+    @router.post("/twice")
+    def save_twice(db: Session = Depends(get_db)):
+        db.add(product("first"))
+        save(db)
+        db.add(product("second"))
+        save(db)
+        return {}
+
+    @router.post("/fail")
+    def fail_after_save(db: Session = Depends(get_db)):
+        db.add(product("lost"))
+        save(db)
+        raise HTTPException(status_code=400, detail="refused")
+
+    @router.post("/callback")
+    def register_callback(db: Session = Depends(get_db)):
+        db.add(product("watched"))
+        save(db)
+        # Runs in the commit: records whether another session sees the row by then
+        after_commit(db, lambda: seen["callbacks"].append(product_count(session_factory)))
+        assert seen["callbacks"] == []
+        return {}
+
+    @router.post("/immediate")
+    def save_immediately(db: Session = Depends(get_db)):
+        db.add(product("kept"))
+        save(db, immediate=True)
+        raise HTTPException(status_code=400, detail="refused")
+
+    def stage_in_dependency(db: Session = Depends(get_db)):
+        db.add(product("from-dependency"))
+        save(db)
+
+    @router.post("/dependency", dependencies=[Depends(stage_in_dependency)])
+    async def async_endpoint(fail: bool = False):
+        if fail:
+            raise HTTPException(status_code=400, detail="refused")
+        return {}
+
+    app = FastAPI()
+    app.include_router(router)
+    yield TestClient(app), session_factory, seen
+    event.remove(engine, "commit", count_commit)
+
+
+def test_request_commits_once(uow):
+    client, session_factory, seen = uow
+    assert client.post("/twice").status_code == 200
+    assert seen["commits"] == 1
+    assert product_count(session_factory) == 2
+
+
+def test_endpoint_exception_rolls_back(uow):
+    client, session_factory, seen = uow
+    assert client.post("/fail").status_code == 400
+    assert seen["commits"] == 0
+    assert product_count(session_factory) == 0
+
+
+def test_after_commit_runs_once_the_commit_is_done(uow):
+    client, session_factory, seen = uow
+    assert client.post("/callback").status_code == 200
+    assert seen["callbacks"] == [1]
+
+
+def test_after_commit_is_dropped_on_rollback(api):
+    """A callback registered before the endpoint raises never runs"""
+    calls = []
+    router = APIRouter(route_class=UnitOfWorkRoute)
+
+    @router.post("/")
+    def register_then_fail(db: Session = Depends(get_db)):
+        db.add(product("lost"))
+        save(db)
+        after_commit(db, lambda: calls.append("ran"))
+        raise HTTPException(status_code=400, detail="refused")
+
+    app = FastAPI()
+    app.include_router(router)
+    assert TestClient(app).post("/").status_code == 400
+    assert calls == []
+
+
+def test_immediate_save_commits_despite_a_later_error(uow):
+    client, session_factory, seen = uow
+    assert client.post("/immediate").status_code == 400
+    assert seen["commits"] == 1
+    assert product_count(session_factory) == 1
+
+
+def test_sync_dependency_in_the_threadpool_joins_the_request(uow):
+    """get_db runs in a worker thread on a copy of the context; the copy shares the request's session list"""
+    client, session_factory, seen = uow
+    # Had the session not joined, its save would have committed on the spot
+    assert client.post("/dependency", params={"fail": True}).status_code == 400
+    assert product_count(session_factory) == 0
+
+    assert client.post("/dependency").status_code == 200
+    assert seen["commits"] == 1
+    assert product_count(session_factory) == 1
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+User cache invalidation checks
+
+Authenticated requests are served from detached user snapshots and
+cached token versions. Updating or deactivating a user drops them once
+the change is committed, so the next request sees the new profile and
+tokens issued before a deactivation stop working.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core.unit_of_work import _request_sessions, commit_request, join_request
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService, token_version_cache, user_cache
+
+CUSTOMER_ID = 2
+
+
+def warm(session_factory, user_id):
+    """Cache a user's snapshot and token version the way an authenticated request does"""
+    db = session_factory()
+    service = UserService(db)
+    service.get_cached_user(user_id)
+    token_version_cache.set(user_id, service.get_token_version(user_id))
+    db.close()
+    assert user_cache.get(user_id) is not None
+
+
+def test_profile_update_is_seen_by_the_next_request(api, login):
+    headers = login("customer")["headers"]
+    assert api.get("/api/v1/users/me", headers=headers).json()["full_name"] is None
+
+    assert api.put("/api/v1/users/me", json={"full_name": "Renamed"}, headers=headers).status_code == 200
+    assert api.get("/api/v1/users/me", headers=headers).json()["full_name"] == "Renamed"
+
+
+def test_deactivation_drops_the_cache_and_outstanding_tokens(api, login):
+    headers = login("customer")["headers"]
+    assert api.get("/api/v1/users/me", headers=headers).status_code == 200
+    warm(api.session_factory, CUSTOMER_ID)
+
+    db = api.session_factory()
+    assert UserService(db).deactivate_user(CUSTOMER_ID)
+    db.close()
+
+    assert user_cache.get(CUSTOMER_ID) is None
+    assert token_version_cache.get(CUSTOMER_ID) is None
+    assert api.get("/api/v1/users/me", headers=headers).status_code == 401
+
+
+def test_update_user_invalidates_only_after_the_commit(api):
+    """Inside a unit of work the cache keeps its snapshot until the request commits"""
+    warm(api.session_factory, CUSTOMER_ID)
+    token = _request_sessions.set([])
+    try:
+        db = api.session_factory()
+        join_request(db)
+        UserService(db).update_user(CUSTOMER_ID, UserUpdate(is_active=False))
+        assert user_cache.get(CUSTOMER_ID) is not None
+
+        asyncio.run(commit_request([db]))
+        db.close()
+    finally:
+        _request_sessions.reset(token)
+
+    assert user_cache.get(CUSTOMER_ID) is None
+    assert token_version_cache.get(CUSTOMER_ID) is None
+    db = api.session_factory()
+    assert UserService(db).get_cached_user(CUSTOMER_ID).is_active is False
+    db.close()